@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Generate call schedules for many call_schedule.db files in one run.
+
+Each database is solved in its own worker process with the same rules as the
+GUI, and its schedules are written next to it (or into --output-dir).
+
+    python batch_scheduler.py cardiology.db surgery.db --start 2025-01-03 --end 2025-12-26
+    python batch_scheduler.py "icu.db@2025-07-04:2025-12-26" --format csv
+
+A database may carry its own date range as PATH@START:END.
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from schedule_engine import validate_date_format, get_schedule_weeks, generate_valid_schedules
+from schedule_db import load_solver_inputs
+from schedule_export import write_schedules
+
+def parse_job(spec, default_start, default_end):
+    """Split PATH[@START:END] into (path, start_date, end_date)"""
+    path, _, date_range = spec.rpartition('@')
+    if not path:
+        path, date_range = spec, ''
+    start, _, end = date_range.partition(':')
+    start = start or default_start
+    end = end or default_end
+    if not start or not end:
+        raise ValueError(f"{spec}: no date range; pass --start/--end or PATH@START:END")
+
+    dates = []
+    for date_str in (start, end):
+        valid, result = validate_date_format(date_str)
+        if not valid:
+            raise ValueError(f"{spec}: {date_str}: {result}")
+        dates.append(result)
+    if dates[0] >= dates[1]:
+        raise ValueError(f"{spec}: end date must be after start date")
+    return path, dates[0], dates[1]
+
+def run_job(db_path, start_date, end_date, output_path, max_schedules, time_budget):
+    """Worker process entry point: solve one database and write its schedules"""
+    started = time.perf_counter()
+    if not os.path.exists(db_path):
+        raise FileNotFoundError("database not found")
+    weeks = get_schedule_weeks(start_date, end_date)
+    personnel, personnel_excluded_weeks = load_solver_inputs(db_path, weeks[0], weeks[-1])
+    if not personnel:
+        raise ValueError("no personnel found")
+    schedules = generate_valid_schedules(personnel, weeks, personnel_excluded_weeks,
+                                         max_schedules=max_schedules, time_budget=time_budget)
+    write_schedules(output_path, schedules, weeks)
+    best_blanks = min((sum(1 for week in schedule if week[0] == "BLANK") for schedule in schedules), default=None)
+    return len(schedules), best_blanks, time.perf_counter() - started
+
+def output_path_for(db_path, start_date, end_date, output_dir, file_format):
+    """<db name>_<start>_<end>.<format>, beside the database unless output_dir is given"""
+    base = os.path.splitext(os.path.basename(db_path))[0]
+    directory = output_dir or os.path.dirname(os.path.abspath(db_path))
+    return os.path.join(directory, f"{base}_{start_date:%Y-%m-%d}_{end_date:%Y-%m-%d}.{file_format}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate call schedules for several databases in parallel")
+    parser.add_argument('databases', nargs='+', metavar='PATH[@START:END]',
+                        help="call_schedule.db files, optionally with their own Friday date range")
+    parser.add_argument('--start', help="default start Friday (YYYY-MM-DD)")
+    parser.add_argument('--end', help="default end Friday (YYYY-MM-DD)")
+    parser.add_argument('--format', choices=['xlsx', 'csv'], default='xlsx', help="output format (default xlsx)")
+    parser.add_argument('--output-dir', help="write all output here instead of beside each database")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="databases solved at once (default: CPU count)")
+    parser.add_argument('--max-schedules', type=int, default=10, help="schedule options per database (default 10)")
+    parser.add_argument('--time-budget', type=float, default=0,
+                        help="seconds to keep improving each database's options (default: stop when found)")
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = [parse_job(spec, args.start, args.end) for spec in args.databases]
+    except ValueError as e:
+        parser.error(str(e))
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    started = time.perf_counter()
+    failures = 0
+    with ProcessPoolExecutor(max_workers=max(1, min(args.workers, len(jobs)))) as executor:
+        futures = {}
+        for db_path, start_date, end_date in jobs:
+            output_path = output_path_for(db_path, start_date, end_date, args.output_dir, args.format)
+            future = executor.submit(run_job, db_path, start_date, end_date, output_path,
+                                     max(1, args.max_schedules), max(0, args.time_budget))
+            futures[future] = (db_path, output_path)
+
+        for future in as_completed(futures):
+            db_path, output_path = futures[future]
+            try:
+                count, best_blanks, elapsed = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"FAILED  {db_path}: {e}", file=sys.stderr)
+                continue
+            summary = f"{count} schedule(s), best {best_blanks} BLANK week(s)" if count else "no valid schedules"
+            print(f"{elapsed:7.2f}s  {db_path}: {summary} -> {output_path}")
+
+    print(f"{len(jobs) - failures}/{len(jobs)} database(s) done in {time.perf_counter() - started:.2f}s")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -36,6 +36,11 @@ def main():
     print("📁 Files to share with Windows users:")
     files = [
         "call_scheduler_optimized.py",
+        "schedule_engine.py",
+        "schedule_db.py",
+        "schedule_export.py",
+        "roster_import.py",
+        "roster_model.py",
         "requirements.txt", 
         "build_executable.py",
         "create_distribution.py",
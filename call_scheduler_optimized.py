@@ -3,14 +3,30 @@ from tkinter import ttk, messagebox, filedialog
 import sqlite3
 import os
 from datetime import datetime, timedelta
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment
 import itertools
-from collections import defaultdict
 import threading
 import queue
-import re
 import calendar
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from schedule_engine import (get_schedule_weeks, fridays_in_range, format_week, solve_cache_key,
+                             generate_valid_schedules, repair_valid_schedules)
+from schedule_db import (ConnectionManager, init_schema, read_solver_inputs, load_cached_schedules,
+                         store_cached_schedules, delete_cache_entries, save_schedule_run, list_schedule_runs,
+                         load_schedule_run, delete_schedule_run, read_personnel_excluded_weeks,
+                         excluded_week_sort_key)
+from schedule_export import write_schedules_xlsx
+from roster_import import RosterImportError, iter_rows, import_roster
+from roster_model import RosterModel
+
+# Excluded weeks are listed a page at a time as the list is scrolled
+EXCLUDED_WEEKS_PAGE_SIZE = 200
+
+# Search fields apply once typing pauses this long; dropdowns list at most this many matches
+FILTER_DELAY_MS = 250
+MAX_COMBO_CANDIDATES = 200
 
 class DatePickerDropdown:
     """Simple and reliable date picker using listbox"""
@@ -195,6 +211,231 @@ class DatePickerDropdown:
                 self.calendar_window.destroy()
                 self.calendar_window = None
 
+class ScheduleGrid:
+    """Schedule options (rows) by weeks (columns) drawn on a canvas.
+
+    Only the cells in view are drawn, and again on every scroll or resize, so a
+    horizon of any length costs the same. BLANK weeks are highlighted.
+    """
+    
+    CELL_WIDTH = 120
+    CELL_HEIGHT = 24
+    ROW_HEADER_WIDTH = 160
+    COLUMN_HEADER_HEIGHT = 36
+    BLANK_COLOR = '#FFFF00'
+    
+    def __init__(self, parent):
+        self.frame = ttk.Frame(parent)
+        self.schedules = []
+        self.weeks = []
+        self.blanks = []
+        self.order = []  # schedule index shown on each row
+        self.sorted_by_blanks = False
+        self.message = ""
+        
+        self.corner = tk.Canvas(self.frame, width=self.ROW_HEADER_WIDTH, height=self.COLUMN_HEADER_HEIGHT,
+                                highlightthickness=0, background='#E0E0E0')
+        self.column_header = tk.Canvas(self.frame, height=self.COLUMN_HEADER_HEIGHT, highlightthickness=0,
+                                       background='#E0E0E0')
+        self.row_header = tk.Canvas(self.frame, width=self.ROW_HEADER_WIDTH, highlightthickness=0,
+                                    background='#E0E0E0')
+        self.body = tk.Canvas(self.frame, highlightthickness=0, background='white')
+        self.xscrollbar = ttk.Scrollbar(self.frame, orient='horizontal', command=self.xview)
+        self.yscrollbar = ttk.Scrollbar(self.frame, orient='vertical', command=self.yview)
+        self.body.configure(xscrollcommand=self.on_xscroll, yscrollcommand=self.on_yscroll)
+        
+        self.corner.grid(row=0, column=0, sticky='nsew')
+        self.column_header.grid(row=0, column=1, sticky='ew')
+        self.row_header.grid(row=1, column=0, sticky='ns')
+        self.body.grid(row=1, column=1, sticky='nsew')
+        self.yscrollbar.grid(row=0, column=2, rowspan=2, sticky='ns')
+        self.xscrollbar.grid(row=2, column=1, sticky='ew')
+        self.frame.rowconfigure(1, weight=1)
+        self.frame.columnconfigure(1, weight=1)
+        
+        self.body.bind('<Configure>', lambda event: self.render())
+        for canvas in (self.body, self.row_header, self.column_header):
+            canvas.bind('<MouseWheel>', self.on_mousewheel)
+            canvas.bind('<Shift-MouseWheel>', lambda event: self.on_mousewheel(event, horizontal=True))
+            canvas.bind('<Button-4>', lambda event: self.yview('scroll', -1, 'units'))
+            canvas.bind('<Button-5>', lambda event: self.yview('scroll', 1, 'units'))
+            canvas.bind('<Shift-Button-4>', lambda event: self.xview('scroll', -1, 'units'))
+            canvas.bind('<Shift-Button-5>', lambda event: self.xview('scroll', 1, 'units'))
+        self.corner.bind('<Button-1>', lambda event: self.sort_by_blanks(not self.sorted_by_blanks))
+        self.draw_corner()
+    
+    def pack(self, **kwargs):
+        return self.frame.pack(**kwargs)
+    
+    def grid(self, **kwargs):
+        return self.frame.grid(**kwargs)
+    
+    def set_data(self, schedules, weeks, message=""):
+        """Show schedules over weeks, keeping the scroll position if the weeks are unchanged"""
+        same_weeks = weeks == self.weeks
+        self.schedules = schedules
+        self.weeks = weeks
+        self.message = message
+        self.blanks = [sum(1 for idx in range(len(weeks)) if self.is_blank(schedule, idx)) for schedule in schedules]
+        self.order = list(range(len(schedules)))
+        if self.sorted_by_blanks:
+            self.order.sort(key=lambda idx: self.blanks[idx])
+        
+        width = len(weeks) * self.CELL_WIDTH
+        height = len(schedules) * self.CELL_HEIGHT
+        self.body.configure(scrollregion=(0, 0, width, height))
+        self.column_header.configure(scrollregion=(0, 0, width, self.COLUMN_HEADER_HEIGHT))
+        self.row_header.configure(scrollregion=(0, 0, self.ROW_HEADER_WIDTH, height))
+        if not same_weeks:
+            self.xview('moveto', 0)
+        self.render()
+    
+    def sort_by_blanks(self, enabled=True):
+        """Order rows by BLANK count (fewest first), or back to the solver's order"""
+        self.sorted_by_blanks = enabled
+        self.order = list(range(len(self.schedules)))
+        if enabled:
+            self.order.sort(key=lambda idx: self.blanks[idx])
+        self.draw_corner()
+        self.render()
+    
+    @staticmethod
+    def is_blank(schedule, week_idx):
+        return week_idx >= len(schedule) or not schedule[week_idx] or schedule[week_idx][0] == "BLANK"
+    
+    def xview(self, *args):
+        self.body.xview(*args)
+        self.column_header.xview(*args)
+    
+    def yview(self, *args):
+        self.body.yview(*args)
+        self.row_header.yview(*args)
+    
+    def on_xscroll(self, first, last):
+        self.xscrollbar.set(first, last)
+        self.column_header.xview('moveto', first)
+        self.render()
+    
+    def on_yscroll(self, first, last):
+        self.yscrollbar.set(first, last)
+        self.row_header.yview('moveto', first)
+        self.render()
+    
+    def on_mousewheel(self, event, horizontal=False):
+        # Windows reports multiples of 120 per notch, macOS small deltas
+        step = -1 if event.delta > 0 else 1
+        if horizontal:
+            self.xview('scroll', step, 'units')
+        else:
+            self.yview('scroll', step, 'units')
+    
+    def draw_corner(self):
+        self.corner.delete('all')
+        text = "Option (BLANK weeks)\n" + ("sorted by BLANK ▲" if self.sorted_by_blanks else "click to sort")
+        self.corner.create_text(6, self.COLUMN_HEADER_HEIGHT // 2, text=text, anchor='w', font=('TkDefaultFont', 8))
+    
+    def render(self):
+        """Draw the cells and headers currently in view"""
+        for canvas in (self.body, self.row_header, self.column_header):
+            canvas.delete('all')
+        if not self.schedules:
+            if self.message:
+                self.body.create_text(10, 10, text=self.message, anchor='nw', font=('TkDefaultFont', 9))
+            return
+        
+        left = self.body.canvasx(0)
+        top = self.body.canvasy(0)
+        first_col = max(0, int(left // self.CELL_WIDTH))
+        last_col = min(len(self.weeks), int((left + self.body.winfo_width()) // self.CELL_WIDTH) + 1)
+        first_row = max(0, int(top // self.CELL_HEIGHT))
+        last_row = min(len(self.order), int((top + self.body.winfo_height()) // self.CELL_HEIGHT) + 1)
+        
+        for col in range(first_col, last_col):
+            x = col * self.CELL_WIDTH
+            self.column_header.create_rectangle(x, 0, x + self.CELL_WIDTH, self.COLUMN_HEADER_HEIGHT,
+                                                outline='#B0B0B0')
+            self.column_header.create_text(x + self.CELL_WIDTH // 2, self.COLUMN_HEADER_HEIGHT // 2,
+                                           text=f"Week {col + 1}\n{format_week(self.weeks[col])}",
+                                           justify='center', font=('TkDefaultFont', 8))
+        
+        for row in range(first_row, last_row):
+            schedule_idx = self.order[row]
+            schedule = self.schedules[schedule_idx]
+            y = row * self.CELL_HEIGHT
+            self.row_header.create_rectangle(0, y, self.ROW_HEADER_WIDTH, y + self.CELL_HEIGHT, outline='#B0B0B0')
+            self.row_header.create_text(6, y + self.CELL_HEIGHT // 2, anchor='w', font=('TkDefaultFont', 9),
+                                        text=f"Option {schedule_idx + 1} ({self.blanks[schedule_idx]} BLANK)")
+            for col in range(first_col, last_col):
+                x = col * self.CELL_WIDTH
+                blank = self.is_blank(schedule, col)
+                self.body.create_rectangle(x, y, x + self.CELL_WIDTH, y + self.CELL_HEIGHT, outline='#D0D0D0',
+                                           fill=self.BLANK_COLOR if blank else '')
+                self.body.create_text(x + 4, y + self.CELL_HEIGHT // 2, anchor='w', width=self.CELL_WIDTH - 8,
+                                      text="BLANK" if blank else ', '.join(schedule[col]),
+                                      font=('TkDefaultFont', 9))
+
+class TreeviewSync:
+    """Keeps a Treeview showing rows keyed by their database id (the first value).
+
+    The rows last shown are remembered, so a refresh only inserts, updates, moves or
+    deletes the items that differ instead of rebuilding the whole list.
+    """
+    
+    def __init__(self, tree):
+        self.tree = tree
+        self.rows = {}  # iid -> values
+        self.order = []  # iids in display order
+    
+    def sync(self, rows):
+        """Show exactly rows, in this order"""
+        wanted = {str(row[0]): tuple(row) for row in rows}
+        stale = [iid for iid in self.order if iid not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+        
+        # Kept items only need moving if their relative order changed
+        kept = [iid for iid in self.order if iid in wanted]
+        in_order = kept == [iid for iid in wanted if iid in self.rows]
+        for index, (iid, values) in enumerate(wanted.items()):
+            if iid not in self.rows:
+                self.tree.insert('', index, iid=iid, values=values)
+                continue
+            if values != self.rows[iid]:
+                self.tree.item(iid, values=values)
+            if not in_order:
+                self.tree.move(iid, '', index)
+        
+        self.rows = wanted
+        self.order = list(wanted)
+    
+    def insert(self, index, row):
+        iid = str(row[0])
+        self.tree.insert('', index, iid=iid, values=row)
+        self.rows[iid] = tuple(row)
+        self.order.insert(index, iid)
+    
+    def update(self, row):
+        iid = str(row[0])
+        if self.rows.get(iid) != tuple(row):
+            self.tree.item(iid, values=row)
+            self.rows[iid] = tuple(row)
+    
+    def append(self, rows):
+        for row in rows:
+            self.insert(len(self.order), row)
+    
+    def delete(self, ids):
+        iids = [str(row_id) for row_id in ids if str(row_id) in self.rows]
+        if iids:
+            self.tree.delete(*iids)
+            for iid in iids:
+                del self.rows[iid]
+            removed = set(iids)
+            self.order = [iid for iid in self.order if iid not in removed]
+    
+    def index(self, row_id):
+        return self.order.index(str(row_id))
+
 class CallSchedulerApp:
     def __init__(self, root):
         self.root = root
@@ -207,7 +448,9 @@ class CallSchedulerApp:
         
         # Database setup
         self.db_path = "call_schedule.db"
+        self.db = ConnectionManager(self.db_path)
         self.init_database()
+        self.roster = RosterModel(self.db)
         
         # Variables
         self.start_date = tk.StringVar()
@@ -217,80 +460,33 @@ class CallSchedulerApp:
         # Threading for schedule generation
         self.schedule_queue = queue.Queue()
         self.generating = False
+        self.cancel_event = threading.Event()
+        self.generation_lower_bound = None
+        self.process_pool = None
+        self.process_pool_workers = 0
+        self.pending_filters = {}
         
         self.create_widgets()
+        self.roster.subscribe(self.on_roster_change)
         self.load_data()
+        self.load_schedule_runs()
         
         # Bind window close event
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
     
-    def validate_date_format(self, date_str):
-        """Validate date format and ensure it's a Friday"""
-        try:
-            # Check format
-            if not re.match(r'^\d{4}-\d{2}-\d{2}$', date_str):
-                return False, "Date must be in YYYY-MM-DD format"
-            
-            # Parse date
-            date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
-            
-            # Check if it's a Friday
-            if date_obj.weekday() != 4:  # Friday is 4
-                return False, "Date must be a Friday"
-            
-            return True, date_obj
-        except ValueError:
-            return False, "Invalid date format"
-    
     def on_closing(self):
         """Handle application closing"""
         if self.generating:
             self.generating = False
+            self.cancel_event.set()
+        if self.process_pool:
+            self.process_pool.shutdown(wait=False)
+        self.db.close()
         self.root.destroy()
         
     def init_database(self):
         """Initialize SQLite database with tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create groups table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS groups (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL
-            )
-        ''')
-        
-        # Create personnel table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS personnel (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                group_id INTEGER,
-                FOREIGN KEY (group_id) REFERENCES groups (id)
-            )
-        ''')
-        
-        # Create excluded weeks table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS excluded_weeks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                week_start TEXT NOT NULL
-            )
-        ''')
-        
-        # Create personnel excluded weeks table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS personnel_excluded_weeks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                personnel_id INTEGER,
-                week_start TEXT NOT NULL,
-                FOREIGN KEY (personnel_id) REFERENCES personnel (id)
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        init_schema(self.db.connection())
     
     def create_widgets(self):
         """Create the main GUI widgets with performance optimizations"""
@@ -346,6 +542,7 @@ class CallSchedulerApp:
         self.groups_tree.configure(yscrollcommand=scrollbar.set)
         
         self.groups_tree.pack(side='left', fill='both', expand=True)
+        self.groups_view = TreeviewSync(self.groups_tree)
         scrollbar.pack(side='right', fill='y')
         
         # Delete button
@@ -363,15 +560,26 @@ class CallSchedulerApp:
         
         ttk.Label(add_frame, text="Group:").grid(row=0, column=2, sticky='w', padx=5, pady=5)
         self.personnel_group_var = tk.StringVar()
-        self.personnel_group_combo = ttk.Combobox(add_frame, textvariable=self.personnel_group_var, width=18)
+        self.personnel_group_combo = ttk.Combobox(add_frame, textvariable=self.personnel_group_var, width=18,
+                                                  postcommand=self.fill_group_combo)
         self.personnel_group_combo.grid(row=0, column=3, padx=5, pady=5)
+        self.personnel_group_combo.bind('<KeyRelease>', lambda event: self.debounce('groups', self.fill_group_combo))
         
         ttk.Button(add_frame, text="Add Personnel", command=self.add_personnel).grid(row=0, column=4, padx=5, pady=5)
+        ttk.Button(add_frame, text="Import from File...", command=self.import_roster_file).grid(row=0, column=5, padx=5, pady=5)
         
         # Personnel list section
         list_frame = ttk.LabelFrame(self.personnel_frame, text="Personnel", padding=5)
         list_frame.pack(fill='both', expand=True, padx=5, pady=5)
         
+        # As-you-type search over the in-memory roster
+        search_frame = ttk.Frame(list_frame)
+        search_frame.pack(side='top', fill='x', pady=(0, 5))
+        ttk.Label(search_frame, text="Search:").pack(side='left', padx=5)
+        self.personnel_filter_var = tk.StringVar()
+        self.personnel_filter_var.trace_add('write', lambda *args: self.debounce('personnel', self.load_personnel))
+        ttk.Entry(search_frame, textvariable=self.personnel_filter_var, width=30).pack(side='left', padx=5)
+        
         # Treeview for personnel with performance optimizations
         columns = ('ID', 'Name', 'Group')
         self.personnel_tree = ttk.Treeview(list_frame, columns=columns, show='headings', height=15)
@@ -386,6 +594,7 @@ class CallSchedulerApp:
         self.personnel_tree.configure(yscrollcommand=scrollbar.set)
         
         self.personnel_tree.pack(side='left', fill='both', expand=True)
+        self.personnel_view = TreeviewSync(self.personnel_tree)
         scrollbar.pack(side='right', fill='y')
         
         # Buttons frame
@@ -415,25 +624,75 @@ class CallSchedulerApp:
         self.generate_button = ttk.Button(date_frame, text="Generate Schedules", command=self.generate_schedules)
         self.generate_button.grid(row=0, column=4, padx=20, pady=5)
         
+        self.cancel_button = ttk.Button(date_frame, text="Cancel", command=self.cancel_generation, state='disabled')
+        self.cancel_button.grid(row=0, column=5, padx=5, pady=5)
+        
+        # Search options
+        ttk.Label(date_frame, text="Worker Processes:").grid(row=1, column=0, sticky='w', padx=5, pady=5)
+        self.workers_var = tk.IntVar(value=1)
+        ttk.Spinbox(date_frame, from_=1, to=os.cpu_count() or 1, textvariable=self.workers_var,
+                    width=5).grid(row=1, column=1, sticky='w', padx=5, pady=5)
+        
+        ttk.Label(date_frame, text="Schedule Options:").grid(row=1, column=2, sticky='w', padx=5, pady=5)
+        self.max_schedules_var = tk.IntVar(value=10)
+        ttk.Spinbox(date_frame, from_=1, to=500, textvariable=self.max_schedules_var,
+                    width=5).grid(row=1, column=3, sticky='w', padx=5, pady=5)
+        
+        # A time budget switches to anytime mode: keep improving until the time is spent
+        ttk.Label(date_frame, text="Time Budget (s, 0 = off):").grid(row=1, column=4, sticky='w', padx=5, pady=5)
+        self.time_budget_var = tk.DoubleVar(value=0)
+        ttk.Spinbox(date_frame, from_=0, to=3600, increment=1, textvariable=self.time_budget_var,
+                    width=5).grid(row=1, column=5, sticky='w', padx=5, pady=5)
+        
         # Progress bar
         self.progress_var = tk.DoubleVar()
         self.progress_bar = ttk.Progressbar(date_frame, variable=self.progress_var, maximum=100)
-        self.progress_bar.grid(row=1, column=0, columnspan=5, sticky='ew', padx=5, pady=5)
+        self.progress_bar.grid(row=2, column=0, columnspan=6, sticky='ew', padx=5, pady=5)
+        
+        self.generation_status_var = tk.StringVar()
+        ttk.Label(date_frame, textvariable=self.generation_status_var).grid(row=3, column=0, columnspan=6,
+                                                                           sticky='w', padx=5)
+        
+        # Past runs section; only run summaries are listed, assignments load when a run is opened
+        history_frame = ttk.LabelFrame(self.schedule_frame, text="Past Runs", padding=5)
+        history_frame.pack(fill='x', padx=5, pady=5)
+        
+        columns = ('Run', 'Created', 'Period', 'Options', 'Best BLANK')
+        self.runs_tree = ttk.Treeview(history_frame, columns=columns, show='headings', height=4)
+        for column, width in zip(columns, (50, 150, 200, 70, 80)):
+            self.runs_tree.heading(column, text=column)
+            self.runs_tree.column(column, width=width, minwidth=width)
+        self.runs_tree.bind('<Double-1>', lambda event: self.open_schedule_run())
+        
+        runs_scrollbar = ttk.Scrollbar(history_frame, orient='vertical', command=self.runs_tree.yview)
+        self.runs_tree.configure(yscrollcommand=runs_scrollbar.set)
+        
+        runs_buttons = ttk.Frame(history_frame)
+        runs_buttons.pack(side='right', fill='y', padx=5)
+        ttk.Button(runs_buttons, text="Open Run", command=self.open_schedule_run).pack(fill='x', pady=2)
+        ttk.Button(runs_buttons, text="Delete Run", command=self.delete_schedule_run).pack(fill='x', pady=2)
+        
+        self.runs_tree.pack(side='left', fill='both', expand=True)
+        runs_scrollbar.pack(side='left', fill='y')
         
         # Results section
         results_frame = ttk.LabelFrame(self.schedule_frame, text="Generated Schedules", padding=5)
         results_frame.pack(fill='both', expand=True, padx=5, pady=5)
         
-        # Text widget to show results with performance optimizations
-        self.results_text = tk.Text(results_frame, wrap='word', height=15, font=('TkDefaultFont', 9))
-        scrollbar = ttk.Scrollbar(results_frame, orient='vertical', command=self.results_text.yview)
-        self.results_text.configure(yscrollcommand=scrollbar.set)
+        # Options x weeks grid; only the visible cells are drawn
+        self.results_summary_var = tk.StringVar()
+        ttk.Label(results_frame, textvariable=self.results_summary_var).pack(side='top', anchor='w')
         
-        self.results_text.pack(side='left', fill='both', expand=True)
-        scrollbar.pack(side='right', fill='y')
+        # Export and repair buttons
+        buttons_frame = ttk.Frame(results_frame)
+        buttons_frame.pack(side='bottom', pady=5)
+        
+        self.results_grid = ScheduleGrid(results_frame)
+        self.results_grid.pack(fill='both', expand=True)
         
-        # Export button
-        ttk.Button(results_frame, text="Export to Excel", command=self.export_to_excel).pack(pady=5)
+        ttk.Button(buttons_frame, text="Export to Excel", command=self.export_to_excel).pack(side='left', padx=5)
+        ttk.Button(buttons_frame, text="Repair After Exclusion Changes",
+                   command=self.repair_schedules).pack(side='left', padx=5)
     
     def create_personnel_excluded_weeks_tab(self):
         """Create the personnel excluded weeks management tab"""
@@ -444,8 +703,11 @@ class CallSchedulerApp:
         # Personnel selection
         ttk.Label(add_frame, text="Select Personnel:").grid(row=0, column=0, sticky='w', padx=5, pady=5)
         self.personnel_excluded_var = tk.StringVar()
-        self.personnel_excluded_combo = ttk.Combobox(add_frame, textvariable=self.personnel_excluded_var, width=25)
+        self.personnel_excluded_combo = ttk.Combobox(add_frame, textvariable=self.personnel_excluded_var, width=25,
+                                                     postcommand=self.fill_personnel_excluded_combo)
         self.personnel_excluded_combo.grid(row=0, column=1, padx=5, pady=5)
+        self.personnel_excluded_combo.bind(
+            '<KeyRelease>', lambda event: self.debounce('personnel_combo', self.fill_personnel_excluded_combo))
         
         # Week selection
         ttk.Label(add_frame, text="Select Week (Friday):").grid(row=0, column=2, sticky='w', padx=5, pady=5)
@@ -453,27 +715,52 @@ class CallSchedulerApp:
         self.personnel_week_picker.grid(row=0, column=3, padx=5, pady=5)
         self.personnel_week_picker.set_date("2025-01-03")  # Default Friday
         
+        # Optional end of a leave; every Friday from the week above through this date is excluded
+        ttk.Label(add_frame, text="Through (optional):").grid(row=1, column=2, sticky='w', padx=5, pady=5)
+        self.personnel_week_end_picker = DatePickerDropdown(add_frame)
+        self.personnel_week_end_picker.grid(row=1, column=3, padx=5, pady=5)
+        self.personnel_week_end_picker.date_var.set("")
+        
         # Add button
-        ttk.Button(add_frame, text="Add Excluded Week", command=self.add_personnel_excluded_week).grid(row=0, column=4, padx=5, pady=5)
+        ttk.Button(add_frame, text="Add Excluded Week(s)", command=self.add_personnel_excluded_week).grid(row=0, column=4, padx=5, pady=5)
         
         # Personnel excluded weeks list section
         list_frame = ttk.LabelFrame(self.personnel_excluded_frame, text="Personnel Excluded Weeks", padding=5)
         list_frame.pack(fill='both', expand=True, padx=5, pady=5)
         
-        # Treeview for personnel excluded weeks
+        # Name filter, applied in SQL to each page
+        filter_frame = ttk.Frame(list_frame)
+        filter_frame.pack(side='top', fill='x', pady=(0, 5))
+        ttk.Label(filter_frame, text="Filter by name:").pack(side='left', padx=5)
+        self.excluded_filter_var = tk.StringVar()
+        self.excluded_filter_var.trace_add(
+            'write', lambda *args: self.debounce('excluded', self.load_personnel_excluded_weeks))
+        ttk.Entry(filter_frame, textvariable=self.excluded_filter_var, width=30).pack(side='left', padx=5)
+        
+        # Treeview for personnel excluded weeks; rows are read a page at a time, sorted in SQL
         columns = ('ID', 'Personnel', 'Week Start')
         self.personnel_excluded_tree = ttk.Treeview(list_frame, columns=columns, show='headings', height=15)
-        self.personnel_excluded_tree.heading('ID', text='ID')
-        self.personnel_excluded_tree.heading('Personnel', text='Personnel')
-        self.personnel_excluded_tree.heading('Week Start', text='Week Start (Friday)')
+        self.excluded_headings = {'ID': ('ID', 'id'), 'Personnel': ('Personnel', 'personnel'),
+                                  'Week Start': ('Week Start (Friday)', 'week')}
+        for column, (text, sort) in self.excluded_headings.items():
+            self.personnel_excluded_tree.heading(column, text=text,
+                                                 command=lambda sort=sort: self.sort_personnel_excluded_weeks(sort))
         self.personnel_excluded_tree.column('ID', width=50, minwidth=50)
         self.personnel_excluded_tree.column('Personnel', width=200, minwidth=150)
         self.personnel_excluded_tree.column('Week Start', width=200, minwidth=150)
+        self.excluded_sort = 'personnel'
+        self.excluded_descending = False
+        self.excluded_last_key = None
+        self.excluded_more = False
+        self.excluded_keys = {}  # iid -> sort key of each row read so far
+        self.excluded_page_pending = False
         
         scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.personnel_excluded_tree.yview)
-        self.personnel_excluded_tree.configure(yscrollcommand=scrollbar.set)
+        self.excluded_scrollbar = scrollbar
+        self.personnel_excluded_tree.configure(yscrollcommand=self.on_excluded_weeks_scroll)
         
         self.personnel_excluded_tree.pack(side='left', fill='both', expand=True)
+        self.personnel_excluded_view = TreeviewSync(self.personnel_excluded_tree)
         scrollbar.pack(side='right', fill='y')
         
         # Delete button
@@ -481,57 +768,75 @@ class CallSchedulerApp:
     
     def load_data(self):
         """Load data from database into GUI"""
-        self.load_groups()
-        self.load_personnel()
+        self.roster.load()
         self.load_personnel_excluded_weeks()
     
+    def on_roster_change(self, kind, action, ids):
+        """Patch the views for the roster rows that changed"""
+        if kind == 'groups':
+            if action == 'reset':
+                self.load_groups()
+                return
+            if action == 'added':
+                for group_id in ids:
+                    self.groups_view.insert(self.roster.group_index(group_id), self.roster.group_row(group_id))
+            elif action == 'deleted':
+                self.groups_view.delete(ids)
+            return
+        
+        # While a search is active the tree shows a subset, so diff it against the new matches
+        if action == 'reset' or self.personnel_filter_var.get().strip():
+            self.load_personnel()
+        elif action == 'deleted':
+            self.personnel_view.delete(ids)
+        elif action == 'added':
+            for person_id in ids:
+                self.personnel_view.insert(self.roster.person_index(person_id), self.roster.person_row(person_id))
+        else:
+            for person_id in ids:
+                self.personnel_view.update(self.roster.person_row(person_id))
+        if action == 'deleted':
+            # Their excluded weeks went with them
+            self.delete_personnel_excluded_rows([
+                week_id for week_id, personnel_name, _ in self.personnel_excluded_view.rows.values()
+                if self.roster.person_id(personnel_name) is None])
+    
     def load_groups(self):
         """Load groups into the groups treeview"""
-        # Clear existing items efficiently
-        for item in self.groups_tree.get_children():
-            self.groups_tree.delete(item)
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT id, name FROM groups ORDER BY name")
-        groups = cursor.fetchall()
-        conn.close()
-        
-        # Batch insert for better performance
-        for group in groups:
-            self.groups_tree.insert('', 'end', values=group)
+        self.groups_view.sync([(group_id, name) for name, group_id in self.roster.group_order])
+    
+    def load_personnel(self):
+        """Load personnel matching the search into the personnel treeview"""
+        text = self.personnel_filter_var.get()
+        matches = self.roster.search_personnel(text) if text.strip() else None
+        self.personnel_view.sync(self.roster.personnel_rows(matches))
+    
+    def debounce(self, key, func):
+        """Call func once FILTER_DELAY_MS pass without another call for the same key"""
+        pending = self.pending_filters.pop(key, None)
+        if pending:
+            self.root.after_cancel(pending)
         
-        # Update personnel group combo
-        self.personnel_group_combo['values'] = [group[1] for group in groups]
+        def run():
+            self.pending_filters.pop(key, None)
+            func()
         
-        # Update personnel excluded combo
-        self.personnel_excluded_combo['values'] = [group[1] for group in groups]
+        self.pending_filters[key] = self.root.after(FILTER_DELAY_MS, run)
     
-    def load_personnel(self):
-        """Load personnel into the personnel treeview"""
-        # Clear existing items efficiently
-        for item in self.personnel_tree.get_children():
-            self.personnel_tree.delete(item)
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT p.id, p.name, g.name 
-            FROM personnel p 
-            LEFT JOIN groups g ON p.group_id = g.id 
-            ORDER BY p.name
-        ''')
-        personnel = cursor.fetchall()
-        conn.close()
-        
-        # Batch insert for better performance
-        for person in personnel:
-            self.personnel_tree.insert('', 'end', values=person)
-        
-        # Update personnel excluded combo with actual personnel names
-        self.personnel_excluded_combo['values'] = [f"{person[1]} ({person[2]})" for person in personnel]
+    def fill_group_combo(self):
+        """List the groups whose name starts with what has been typed"""
+        text = self.personnel_group_var.get().strip().casefold()
+        names = self.roster.group_names()
+        if text and self.personnel_group_var.get() not in names:
+            names = [name for name in names if name.casefold().startswith(text)]
+        self.personnel_group_combo['values'] = names
     
-
+    def fill_personnel_excluded_combo(self):
+        """List personnel matching what has been typed, unless a listed entry is already chosen"""
+        text = self.personnel_excluded_var.get()
+        if ' (' in text and text.endswith(')'):
+            text = ''
+        self.personnel_excluded_combo['values'] = self.roster.person_labels(text, MAX_COMBO_CANDIDATES)
     
     def add_group(self):
         """Add a new group"""
@@ -541,14 +846,8 @@ class CallSchedulerApp:
             return
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO groups (name) VALUES (?)", (name,))
-            conn.commit()
-            conn.close()
-            
+            self.roster.add_group(name)
             self.group_name_entry.delete(0, tk.END)
-            self.load_groups()
             messagebox.showinfo("Success", f"Group '{name}' added successfully")
         except sqlite3.IntegrityError:
             messagebox.showerror("Error", "Group name already exists")
@@ -567,11 +866,7 @@ class CallSchedulerApp:
         group_name = item['values'][1]
         
         # Check if group has personnel
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM personnel WHERE group_id = ?", (group_id,))
-        count = cursor.fetchone()[0]
-        conn.close()
+        count = self.roster.personnel_count(group_id)
         
         if count > 0:
             messagebox.showerror("Error", f"Cannot delete group '{group_name}' - it has {count} personnel assigned")
@@ -579,14 +874,7 @@ class CallSchedulerApp:
         
         if messagebox.askyesno("Confirm", f"Are you sure you want to delete group '{group_name}'?"):
             try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM groups WHERE id = ?", (group_id,))
-                conn.commit()
-                conn.close()
-                
-                self.load_groups()
-                self.load_personnel()
+                self.roster.delete_group(group_id)
                 messagebox.showinfo("Success", f"Group '{group_name}' deleted successfully")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete group: {str(e)}")
@@ -604,30 +892,49 @@ class CallSchedulerApp:
             messagebox.showerror("Error", "Please select a group")
             return
         
+        group_id = self.roster.group_id(group_name)
+        if group_id is None:
+            messagebox.showerror("Error", "Selected group not found")
+            return
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get group ID
-            cursor.execute("SELECT id FROM groups WHERE name = ?", (group_name,))
-            group_result = cursor.fetchone()
-            if not group_result:
-                messagebox.showerror("Error", "Selected group not found")
-                return
-            
-            group_id = group_result[0]
-            
-            cursor.execute("INSERT INTO personnel (name, group_id) VALUES (?, ?)", (name, group_id))
-            conn.commit()
-            conn.close()
+            self.roster.add_personnel(name, group_id)
             
+            # Every stored solve was made without this person
+            self.invalidate_solve_cache()
             self.personnel_name_entry.delete(0, tk.END)
             self.personnel_group_var.set('')
-            self.load_personnel()
             messagebox.showinfo("Success", f"Personnel '{name}' added successfully")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to add personnel: {str(e)}")
     
+    def import_roster_file(self):
+        """Import groups, personnel and excluded weeks from a CSV or Excel file in one transaction"""
+        filename = filedialog.askopenfilename(
+            filetypes=[("Roster files", "*.csv *.xlsx"), ("CSV files", "*.csv"), ("Excel files", "*.xlsx"),
+                       ("All files", "*.*")],
+            title="Import Roster"
+        )
+        
+        if not filename:
+            return
+        
+        try:
+            with self.db.transaction() as cursor:
+                added = import_roster(cursor, iter_rows(filename))
+        except RosterImportError as e:
+            messagebox.showerror("Error", f"Nothing was imported:\n{e}")
+            return
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to import roster: {str(e)}")
+            return
+        
+        # One refresh for the whole file
+        self.invalidate_solve_cache()
+        self.load_data()
+        messagebox.showinfo("Success", f"Imported {added['groups']} group(s), {added['personnel']} personnel "
+                                       f"and {added['exclusions']} excluded week(s)")
+    
     def delete_personnel(self):
         """Delete selected personnel"""
         selection = self.personnel_tree.selection()
@@ -641,13 +948,8 @@ class CallSchedulerApp:
         
         if messagebox.askyesno("Confirm", f"Are you sure you want to delete '{person_name}'?"):
             try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM personnel WHERE id = ?", (person_id,))
-                conn.commit()
-                conn.close()
-                
-                self.load_personnel()
+                self.roster.delete_personnel(person_id)
+                self.invalidate_solve_cache(person_id)
                 messagebox.showinfo("Success", f"Personnel '{person_name}' deleted successfully")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to delete personnel: {str(e)}")
@@ -676,14 +978,7 @@ class CallSchedulerApp:
         group_combo = ttk.Combobox(dialog, textvariable=group_var, width=20)
         group_combo.pack(pady=10)
         
-        # Load groups
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM groups ORDER BY name")
-        groups = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        
-        group_combo['values'] = groups
+        group_combo['values'] = self.roster.group_names()
         
         def confirm_reassign():
             new_group = group_var.get()
@@ -691,16 +986,14 @@ class CallSchedulerApp:
                 messagebox.showerror("Error", "Please select a group", parent=dialog)
                 return
             
+            group_id = self.roster.group_id(new_group)
+            if group_id is None:
+                messagebox.showerror("Error", "Selected group not found", parent=dialog)
+                return
+            
             try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute("SELECT id FROM groups WHERE name = ?", (new_group,))
-                group_id = cursor.fetchone()[0]
-                cursor.execute("UPDATE personnel SET group_id = ? WHERE id = ?", (group_id, person_id))
-                conn.commit()
-                conn.close()
-                
-                self.load_personnel()
+                self.roster.reassign_personnel(person_id, group_id)
+                self.invalidate_solve_cache(person_id)
                 dialog.destroy()
                 messagebox.showinfo("Success", f"'{person_name}' reassigned to '{new_group}'")
             except Exception as e:
@@ -710,28 +1003,88 @@ class CallSchedulerApp:
         ttk.Button(dialog, text="Cancel", command=dialog.destroy).pack(pady=5)
     
     def load_personnel_excluded_weeks(self):
-        """Load personnel excluded weeks into the treeview"""
-        # Clear existing items efficiently
-        for item in self.personnel_excluded_tree.get_children():
-            self.personnel_excluded_tree.delete(item)
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT pew.id, p.name, pew.week_start 
-            FROM personnel_excluded_weeks pew
-            JOIN personnel p ON pew.personnel_id = p.id
-            ORDER BY p.name, pew.week_start
-        ''')
-        personnel_weeks = cursor.fetchall()
-        conn.close()
-        
-        # Batch insert for better performance
-        for week in personnel_weeks:
-            self.personnel_excluded_tree.insert('', 'end', values=week)
+        """Read the first page of the excluded weeks list; later pages are read as it is scrolled.
+
+        Adding and deleting excluded weeks patches the rows read so far instead of reading
+        them again, see insert_personnel_excluded_rows and delete_personnel_excluded_rows.
+        """
+        rows = read_personnel_excluded_weeks(self.db.connection(), self.excluded_sort, self.excluded_descending,
+                                             limit=EXCLUDED_WEEKS_PAGE_SIZE,
+                                             name_filter=self.excluded_filter_var.get().strip())
+        self.excluded_last_key = excluded_week_sort_key(rows[-1], self.excluded_sort) if rows else None
+        self.excluded_more = len(rows) == EXCLUDED_WEEKS_PAGE_SIZE
+        self.excluded_keys = {str(row[0]): excluded_week_sort_key(row, self.excluded_sort) for row in rows}
+        self.personnel_excluded_view.sync([(week_id, personnel_name, format_week(week_start))
+                                           for week_id, personnel_name, week_start in rows])
+    
+    def load_more_personnel_excluded_weeks(self):
+        """Append the next page of the personnel excluded weeks list"""
+        self.excluded_page_pending = False
+        if not self.excluded_more:
+            return
+        rows = read_personnel_excluded_weeks(self.db.connection(), self.excluded_sort, self.excluded_descending,
+                                             self.excluded_last_key, EXCLUDED_WEEKS_PAGE_SIZE,
+                                             self.excluded_filter_var.get().strip())
+        if rows:
+            self.excluded_last_key = excluded_week_sort_key(rows[-1], self.excluded_sort)
+        self.excluded_more = len(rows) == EXCLUDED_WEEKS_PAGE_SIZE
+        for row in rows:
+            self.excluded_keys[str(row[0])] = excluded_week_sort_key(row, self.excluded_sort)
+        self.personnel_excluded_view.append([(week_id, personnel_name, format_week(week_start))
+                                             for week_id, personnel_name, week_start in rows])
+    
+    def insert_personnel_excluded_rows(self, personnel_id, first_week, last_week):
+        """Show weeks just excluded for one person among the rows read so far, in sort order"""
+        rows = read_personnel_excluded_weeks(self.db.connection(), self.excluded_sort, self.excluded_descending,
+                                             limit=last_week - first_week + 1,
+                                             name_filter=self.excluded_filter_var.get().strip(),
+                                             personnel_id=personnel_id, week_range=(first_week, last_week))
+        view = self.personnel_excluded_view
+        keys = [self.excluded_keys[iid] for iid in view.order]
+        for week_id, personnel_name, week_start in rows:
+            key = excluded_week_sort_key((week_id, personnel_name, week_start), self.excluded_sort)
+            if str(week_id) in view.rows:
+                continue
+            # Rows past the last one read arrive with a later page
+            if self.excluded_more and (key < self.excluded_last_key if self.excluded_descending
+                                       else key > self.excluded_last_key):
+                continue
+            index = next((idx for idx, other in enumerate(keys)
+                          if (other < key if self.excluded_descending else other > key)), len(keys))
+            keys.insert(index, key)
+            self.excluded_keys[str(week_id)] = key
+            view.insert(index, (week_id, personnel_name, format_week(week_start)))
+    
+    def delete_personnel_excluded_rows(self, week_ids):
+        """Remove deleted excluded weeks from the rows read so far"""
+        self.personnel_excluded_view.delete(week_ids)
+        for week_id in week_ids:
+            self.excluded_keys.pop(str(week_id), None)
+    
+    def on_excluded_weeks_scroll(self, first, last):
+        """Move the scrollbar, and read the next page once the end of the loaded rows comes into view"""
+        self.excluded_scrollbar.set(first, last)
+        if float(last) > 0.9 and self.excluded_more and not self.excluded_page_pending:
+            self.excluded_page_pending = True
+            self.root.after_idle(self.load_more_personnel_excluded_weeks)
+    
+    def sort_personnel_excluded_weeks(self, sort):
+        """Sort the personnel excluded weeks list by a column; clicking it again reverses the order"""
+        if sort == self.excluded_sort:
+            self.excluded_descending = not self.excluded_descending
+        else:
+            self.excluded_sort = sort
+            self.excluded_descending = False
+        for column, (text, column_sort) in self.excluded_headings.items():
+            arrow = (' ▼' if self.excluded_descending else ' ▲') if column_sort == sort else ''
+            self.personnel_excluded_tree.heading(column, text=text + arrow)
+        
+        # Start over from the first page in the new order
+        self.load_personnel_excluded_weeks()
+        self.personnel_excluded_tree.yview_moveto(0)
     
     def add_personnel_excluded_week(self):
-        """Add excluded week for specific personnel"""
+        """Add excluded week for specific personnel, or every Friday of a date range"""
         personnel_name = self.personnel_excluded_var.get()
         week_date = self.personnel_week_picker.get_date()
         
@@ -743,40 +1096,83 @@ class CallSchedulerApp:
             messagebox.showerror("Error", "Please select a valid week date")
             return
         
+        if self.personnel_week_end_picker.date_var.get().strip():
+            self.add_personnel_excluded_range(personnel_name.split(' (')[0], week_date)
+            return
+        
         week_str = week_date.strftime('%Y-%m-%d')
+        week = week_date.toordinal()
         
         # Extract personnel name from "Name (Group)" format
         personnel_name_clean = personnel_name.split(' (')[0]
         
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            # Dialogs wait until the transaction has ended so the write lock is not held while they are open
+            error = None
+            with self.db.transaction() as cursor:
+                # Get personnel ID
+                cursor.execute("SELECT id FROM personnel WHERE name = ?", (personnel_name_clean,))
+                personnel_result = cursor.fetchone()
+                if not personnel_result:
+                    error = "Selected personnel not found"
+                else:
+                    personnel_id = personnel_result[0]
+                    
+                    # The unique (personnel_id, week_start) index rejects duplicates
+                    cursor.execute("INSERT OR IGNORE INTO personnel_excluded_weeks (personnel_id, week_start) VALUES (?, ?)", 
+                                 (personnel_id, week))
+                    if cursor.rowcount == 0:
+                        error = "This week is already excluded for this personnel"
             
-            # Get personnel ID
-            cursor.execute("SELECT id FROM personnel WHERE name = ?", (personnel_name_clean,))
+            if error:
+                messagebox.showerror("Error", error)
+                return
+            
+            self.invalidate_solve_cache(personnel_id, week)
+            self.insert_personnel_excluded_rows(personnel_id, week, week)
+            messagebox.showinfo("Success", f"Excluded week starting {week_str} added for {personnel_name_clean}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to add excluded week: {str(e)}")
+    
+    def add_personnel_excluded_range(self, personnel_name, start_date):
+        """Exclude every Friday from start_date through the end picker's date in one insert"""
+        end_date = self.personnel_week_end_picker.get_date()
+        if not end_date:
+            messagebox.showerror("Error", "Please select a valid end date or clear it")
+            return
+        if end_date < start_date:
+            messagebox.showerror("Error", "End date must not be before start date")
+            return
+        
+        weeks = fridays_in_range(start_date, end_date)
+        if not weeks:
+            messagebox.showerror("Error", "There is no Friday in the selected range")
+            return
+        
+        try:
+            cursor = self.db.connection().cursor()
+            cursor.execute("SELECT id FROM personnel WHERE name = ?", (personnel_name,))
             personnel_result = cursor.fetchone()
             if not personnel_result:
                 messagebox.showerror("Error", "Selected personnel not found")
                 return
-            
             personnel_id = personnel_result[0]
             
-            # Check if already exists
-            cursor.execute("SELECT id FROM personnel_excluded_weeks WHERE personnel_id = ? AND week_start = ?", 
-                         (personnel_id, week_str))
-            if cursor.fetchone():
-                messagebox.showerror("Error", "This week is already excluded for this personnel")
-                return
-            
-            cursor.execute("INSERT INTO personnel_excluded_weeks (personnel_id, week_start) VALUES (?, ?)", 
-                         (personnel_id, week_str))
-            conn.commit()
-            conn.close()
+            with self.db.transaction() as cursor:
+                # Weeks that are already excluded are skipped by the unique index
+                cursor.executemany("INSERT OR IGNORE INTO personnel_excluded_weeks (personnel_id, week_start) VALUES (?, ?)",
+                                   [(personnel_id, week) for week in weeks])
+                added = cursor.rowcount
             
-            self.load_personnel_excluded_weeks()
-            messagebox.showinfo("Success", f"Excluded week starting {week_str} added for {personnel_name_clean}")
+            self.invalidate_solve_cache(personnel_id, weeks[0], weeks[-1])
+            self.insert_personnel_excluded_rows(personnel_id, weeks[0], weeks[-1])
+            self.personnel_week_end_picker.date_var.set("")
+            skipped = len(weeks) - added
+            messagebox.showinfo("Success", f"{added} excluded week(s) from {format_week(weeks[0])} to "
+                                           f"{format_week(weeks[-1])} added for {personnel_name}"
+                                           + (f" ({skipped} already excluded)" if skipped else ""))
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to add excluded week: {str(e)}")
+            messagebox.showerror("Error", f"Failed to add excluded weeks: {str(e)}")
     
     def delete_personnel_excluded_week(self):
         """Delete selected personnel excluded week"""
@@ -792,13 +1188,14 @@ class CallSchedulerApp:
         
         if messagebox.askyesno("Confirm", f"Are you sure you want to remove excluded week starting {week_start} for {personnel_name}?"):
             try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM personnel_excluded_weeks WHERE id = ?", (week_id,))
-                conn.commit()
-                conn.close()
+                with self.db.transaction() as cursor:
+                    cursor.execute("SELECT personnel_id, week_start FROM personnel_excluded_weeks WHERE id = ?", (week_id,))
+                    row = cursor.fetchone()
+                    cursor.execute("DELETE FROM personnel_excluded_weeks WHERE id = ?", (week_id,))
                 
-                self.load_personnel_excluded_weeks()
+                if row:
+                    self.invalidate_solve_cache(*row)
+                self.delete_personnel_excluded_rows([week_id])
                 messagebox.showinfo("Success", "Excluded week removed successfully")
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to remove excluded week: {str(e)}")
@@ -825,200 +1222,251 @@ class CallSchedulerApp:
             messagebox.showerror("Error", "End date must be after start date")
             return
         
-        # Get personnel and groups
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT p.id, p.name, g.name 
-            FROM personnel p 
-            LEFT JOIN groups g ON p.group_id = g.id 
-            ORDER BY p.name
-        ''')
-        personnel = cursor.fetchall()
-        
-        # Get personnel excluded weeks
-        cursor.execute('''
-            SELECT p.name, pew.week_start 
-            FROM personnel_excluded_weeks pew
-            JOIN personnel p ON pew.personnel_id = p.id
-        ''')
-        personnel_excluded_weeks = {}
-        for row in cursor.fetchall():
-            personnel_name, week_start = row
-            if personnel_name not in personnel_excluded_weeks:
-                personnel_excluded_weeks[personnel_name] = []
-            personnel_excluded_weeks[personnel_name].append(week_start)
-        
-        conn.close()
+        # Get personnel, groups and the personnel excluded weeks inside the period
+        weeks = get_schedule_weeks(start_date, end_date)
+        personnel, personnel_excluded_weeks = read_solver_inputs(self.db.connection(), weeks[0], weeks[-1])
         
         if not personnel:
             messagebox.showerror("Error", "No personnel found. Please add personnel first.")
             return
         
+        try:
+            workers = max(1, self.workers_var.get())
+            max_schedules = max(1, self.max_schedules_var.get())
+            time_budget = max(0, self.time_budget_var.get())
+        except tk.TclError:
+            messagebox.showerror("Error", "Worker processes, schedule options and time budget must be numbers")
+            return
+        
+        # Reuse the stored result when nothing the solver reads has changed
+        fingerprint = solve_cache_key(personnel, personnel_excluded_weeks, weeks, max_schedules, time_budget)
+        cached = load_cached_schedules(self.db.connection(), fingerprint)
+        if cached is not None:
+            self.display_schedules(cached, weeks)
+            self.progress_var.set(100)
+            self.generation_status_var.set(f"Loaded {len(cached)} schedule(s) from cache")
+            return
+        self.pending_cache_entry = (fingerprint, weeks, [person[0] for person in personnel])
+        
         # Start generation in background thread
         self.generating = True
+        self.cancel_event = threading.Event()
         self.generate_button.config(state='disabled')
+        self.cancel_button.config(state='normal')
         self.progress_var.set(0)
+        self.generation_lower_bound = None
+        self.generation_status_var.set("Searching...")
         
         # Start background thread
         thread = threading.Thread(target=self.generate_schedules_thread, 
-                                args=(personnel, personnel_excluded_weeks, start_date, end_date))
+                                args=(personnel, personnel_excluded_weeks, start_date, end_date),
+                                kwargs={'workers': workers, 'max_schedules': max_schedules,
+                                        'time_budget': time_budget, 'cancel_event': self.cancel_event})
         thread.daemon = True
         thread.start()
         
         # Start progress monitoring
         self.root.after(100, self.check_generation_progress)
     
-    def generate_schedules_thread(self, personnel, personnel_excluded_weeks, start_date, end_date):
+    def repair_schedules(self):
+        """Repair the displayed schedules against the current exclusions, changing as few weeks as possible"""
+        if not getattr(self, 'current_schedules', None):
+            messagebox.showwarning("Warning", "No schedules to repair. Please generate schedules first.")
+            return
+        if self.generating:
+            messagebox.showwarning("Warning", "Schedule generation already in progress")
+            return
+        
+        weeks = self.current_weeks
+        personnel, personnel_excluded_weeks = read_solver_inputs(self.db.connection(), weeks[0], weeks[-1])
+        repaired_schedules, changed_weeks = repair_valid_schedules(
+            personnel, weeks, personnel_excluded_weeks, self.current_schedules)
+        
+        self.display_schedules(repaired_schedules, weeks)
+        self.generation_status_var.set(
+            f"Repaired {len(repaired_schedules)} schedule(s): {changed_weeks} week(s) changed")
+    
+    def cancel_generation(self):
+        """Ask the generator thread to stop; it reports back through the queue"""
+        self.cancel_event.set()
+        self.cancel_button.config(state='disabled')
+        self.generation_status_var.set("Cancelling...")
+    
+    def generate_schedules_thread(self, personnel, personnel_excluded_weeks, start_date, end_date, workers=1,
+                                  max_schedules=10, time_budget=None, cancel_event=None):
         """Generate schedules in background thread"""
         try:
             # Generate weeks
-            weeks = []
-            current_date = start_date
-            while current_date <= end_date:
-                week_str = current_date.strftime('%Y-%m-%d')
-                weeks.append(week_str)
-                current_date += timedelta(days=7)
+            weeks = get_schedule_weeks(start_date, end_date)
             
             if not weeks:
                 self.schedule_queue.put(("error", "No available weeks in the selected period"))
                 return
             
-            # Generate schedules
-            schedules = self.generate_valid_schedules(personnel, weeks, personnel_excluded_weeks)
+            def report(event):
+                # Streamed improvements need the weeks to be displayed
+                if 'pool' in event:
+                    event['weeks'] = weeks
+                self.schedule_queue.put(("progress", event))
+            
+            # Generate schedules; if a worker process died, retry once on a fresh pool
+            for retry in (False, True):
+                executor = self.get_process_pool(workers) if workers > 1 else None
+                try:
+                    schedules = generate_valid_schedules(
+                        personnel, weeks, personnel_excluded_weeks, workers, cancel_event,
+                        progress=report, max_schedules=max_schedules, time_budget=time_budget, executor=executor)
+                    break
+                except BrokenProcessPool:
+                    # A broken pool fails every later submit, so the next run must not reuse it
+                    executor.shutdown(wait=False)
+                    self.process_pool = None
+                    if retry:
+                        raise
             
             # Put results in queue
-            self.schedule_queue.put(("success", (schedules, weeks)))
+            cancelled = cancel_event is not None and cancel_event.is_set()
+            self.schedule_queue.put(("cancelled" if cancelled else "success", (schedules, weeks)))
             
         except Exception as e:
             self.schedule_queue.put(("error", str(e)))
     
     def check_generation_progress(self):
-        """Check for generation completion"""
+        """Apply progress events from the generator thread until it reports completion"""
+        latest_pool = None
         try:
-            result_type, result_data = self.schedule_queue.get_nowait()
-            
-            if result_type == "success":
-                schedules, weeks = result_data
-                self.display_schedules(schedules, weeks)
-            else:
-                messagebox.showerror("Error", result_data)
-            
-            self.generating = False
-            self.generate_button.config(state='normal')
-            self.progress_var.set(100)
-            
+            while True:
+                result_type, result_data = self.schedule_queue.get_nowait()
+                if result_type != "progress":
+                    break
+                self.show_generation_progress(result_data)
+                if 'pool' in result_data:
+                    latest_pool = result_data
         except queue.Empty:
-            # Still generating, update progress and check again
-            current_progress = self.progress_var.get()
-            if current_progress < 90:
-                self.progress_var.set(current_progress + 5)
-            self.root.after(200, self.check_generation_progress)
-    
-    def generate_valid_schedules(self, personnel, weeks, personnel_excluded_weeks):
-        """Generate valid schedules based on rules"""
-        schedules = []
-        max_schedules = 10
-        
-        # Group personnel by group
-        groups = defaultdict(list)
-        for person in personnel:
-            person_id, name, group_name = person
-            groups[group_name].append((person_id, name))
-        
-        # Create all possible assignments
-        all_personnel = [(p[0], p[1], p[2]) for p in personnel]
-        
-        # Try different combinations
-        attempts = 0
-        max_attempts = 5000  # Reduced for better performance
-        
-        while len(schedules) < max_schedules and attempts < max_attempts:
-            attempts += 1
-            
-            # Shuffle personnel for variety
-            import random
-            random.shuffle(all_personnel)
-            
-            schedule = self.try_create_schedule(all_personnel, weeks, groups, personnel_excluded_weeks)
-            if schedule:
-                # Check if this schedule is unique
-                schedule_tuple = tuple(tuple(week) for week in schedule)
-                if schedule_tuple not in [tuple(tuple(week) for week in s) for s in schedules]:
-                    schedules.append(schedule)
-        
-        return schedules
-    
-    def try_create_schedule(self, personnel, weeks, groups, personnel_excluded_weeks):
-        """Try to create a valid schedule"""
-        schedule = []
-        used_personnel = set()
-        last_group_week = {}  # Track last week each group was used
-        
-        for week_idx, week in enumerate(weeks):
-            week_assignments = []
-            
-            # Find available personnel for this week
-            available = []
-            for person_id, name, group_name in personnel:
-                if person_id in used_personnel:
-                    continue
-                
-                # Check if group was used in last 2 weeks
-                if group_name in last_group_week:
-                    if week_idx - last_group_week[group_name] < 2:
-                        continue
-                
-                # Check if this person has excluded this week
-                if name in personnel_excluded_weeks and week in personnel_excluded_weeks[name]:
-                    continue
-                
-                available.append((person_id, name, group_name))
-            
-            if not available:
-                # No available personnel, mark as blank
-                week_assignments.append("BLANK")
+            # Still generating: show the newest streamed improvement and check again
+            if latest_pool:
+                self.display_schedules(latest_pool['pool'], latest_pool['weeks'])
+            self.root.after(100, self.check_generation_progress)
+            return
+        
+        if result_type in ("success", "cancelled"):
+            schedules, weeks = result_data
+            self.display_schedules(schedules, weeks)
+            if result_type == "cancelled":
+                self.generation_status_var.set(f"Cancelled - showing {len(schedules)} schedule(s) found so far")
             else:
-                # Select personnel for this week
-                for person_id, name, group_name in available:
-                    if person_id not in used_personnel:
-                        week_assignments.append(name)
-                        used_personnel.add(person_id)
-                        last_group_week[group_name] = week_idx
-                        break
-            
-            schedule.append(week_assignments)
+                store_cached_schedules(self.db.connection(), *self.pending_cache_entry, schedules)
+                status = f"Done - {len(schedules)} schedule(s) found"
+                if self.generation_lower_bound:
+                    status += f"; at least {self.generation_lower_bound} BLANK week(s) are unavoidable"
+                if schedules:
+                    run_id = save_schedule_run(self.db.connection(), weeks, schedules)
+                    self.load_schedule_runs()
+                    status += f" (saved as run {run_id})"
+                self.generation_status_var.set(status)
+        else:
+            self.generation_status_var.set("")
+            messagebox.showerror("Error", result_data)
         
-        return schedule if len(schedule) == len(weeks) else None
+        self.generating = False
+        self.generate_button.config(state='normal')
+        self.cancel_button.config(state='disabled')
+        self.progress_var.set(100)
     
-    def display_schedules(self, schedules, weeks):
-        """Display generated schedules in the results text widget"""
-        self.results_text.delete(1.0, tk.END)
+    def show_generation_progress(self, event):
+        """Drive the progress bar and status line from a solver progress event"""
+        if event['time_budget']:
+            done = event['elapsed'] / event['time_budget']
+        else:
+            done = max(event['attempts'] / event['max_attempts'], event['schedules'] / event['max_schedules'])
+        self.progress_var.set(min(99, 100 * done))
+        
+        status = f"Attempts: {event['attempts']}   Schedules found: {event['schedules']}"
+        if event['best_blanks'] is not None:
+            status += f"   Best BLANK weeks: {event['best_blanks']}"
+        self.generation_lower_bound = event['lower_bound']
+        if self.generation_lower_bound:
+            status += f"   Full coverage impossible: at least {self.generation_lower_bound} BLANK week(s)"
+        self.generation_status_var.set(status)
+    
+    def invalidate_solve_cache(self, personnel_id=None, week=None, last_week=None):
+        """Drop stored results that depend on personnel_id (and cover week, or overlap week..last_week).
+
+        With no personnel_id every result is dropped, e.g. after someone joins the roster.
+        """
+        with self.db.transaction() as cursor:
+            if personnel_id is None:
+                cursor.execute("DELETE FROM solve_cache")
+                cursor.execute("DELETE FROM solve_cache_personnel")
+            else:
+                query = '''
+                    SELECT sc.fingerprint FROM solve_cache sc
+                    JOIN solve_cache_personnel scp ON scp.fingerprint = sc.fingerprint
+                    WHERE scp.personnel_id = ?
+                '''
+                params = [personnel_id]
+                if week is not None:
+                    query += " AND sc.start_week <= ? AND sc.end_week >= ?"
+                    params += [last_week if last_week is not None else week, week]
+                cursor.execute(query, params)
+                delete_cache_entries(cursor, [row[0] for row in cursor.fetchall()])
+    
+    def load_schedule_runs(self):
+        """List saved runs in the Past Runs view without reading their assignments"""
+        self.runs_tree.delete(*self.runs_tree.get_children())
+        for run_id, created_at, start_week, end_week, options, best_blanks in list_schedule_runs(self.db.connection()):
+            self.runs_tree.insert('', 'end', iid=str(run_id), values=(
+                run_id, datetime.fromtimestamp(created_at).strftime('%Y-%m-%d %H:%M'),
+                f"{format_week(start_week)} to {format_week(end_week)}", options, best_blanks))
+    
+    def open_schedule_run(self):
+        """Load the selected run's assignments and show them as the current schedules"""
+        selection = self.runs_tree.selection()
+        if not selection:
+            messagebox.showwarning("Warning", "Please select a run to open")
+            return
         
+        run = load_schedule_run(self.db.connection(), int(selection[0]))
+        if run is None:
+            self.load_schedule_runs()
+            return
+        weeks, schedules = run
+        self.display_schedules(schedules, weeks)
+        self.generation_status_var.set(f"Opened run {selection[0]}: {len(schedules)} schedule(s)")
+    
+    def delete_schedule_run(self):
+        """Delete the selected run and its assignments"""
+        selection = self.runs_tree.selection()
+        if not selection:
+            messagebox.showwarning("Warning", "Please select a run to delete")
+            return
+        
+        if messagebox.askyesno("Confirm", f"Are you sure you want to delete run {selection[0]}?"):
+            try:
+                delete_schedule_run(self.db.connection(), int(selection[0]))
+                self.runs_tree.delete(selection[0])
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to delete run: {str(e)}")
+    
+    def get_process_pool(self, workers):
+        """Return a process pool with the requested number of workers, reusing the warm one if possible"""
+        if self.process_pool is None or self.process_pool_workers != workers:
+            if self.process_pool:
+                self.process_pool.shutdown(wait=False)
+            self.process_pool = ProcessPoolExecutor(max_workers=workers)
+            self.process_pool_workers = workers
+        return self.process_pool
+    
+    def display_schedules(self, schedules, weeks):
+        """Display generated schedules in the results grid"""
         if not schedules:
-            self.results_text.insert(tk.END, "No valid schedules found.\n")
-            self.results_text.insert(tk.END, "Try adjusting the personnel, groups, or time period.\n")
+            self.results_summary_var.set("")
+            self.results_grid.set_data([], weeks, "No valid schedules found.\n"
+                                                  "Try adjusting the personnel, groups, or time period.")
             return
         
-        self.results_text.insert(tk.END, f"Generated {len(schedules)} valid schedule(s):\n\n")
-        
-        for i, schedule in enumerate(schedules, 1):
-            self.results_text.insert(tk.END, f"Schedule Option {i}:\n")
-            self.results_text.insert(tk.END, "-" * 50 + "\n")
-            
-            for j, week in enumerate(weeks):
-                week_date = datetime.strptime(week, '%Y-%m-%d')
-                week_display = week_date.strftime('%Y-%m-%d')
-                
-                if j < len(schedule) and schedule[j]:
-                    if schedule[j][0] == "BLANK":
-                        self.results_text.insert(tk.END, f"Week {j+1} ({week_display}): BLANK\n")
-                    else:
-                        self.results_text.insert(tk.END, f"Week {j+1} ({week_display}): {', '.join(schedule[j])}\n")
-                else:
-                    self.results_text.insert(tk.END, f"Week {j+1} ({week_display}): BLANK\n")
-            
-            self.results_text.insert(tk.END, "\n")
+        self.results_summary_var.set(f"Generated {len(schedules)} valid schedule(s) over {len(weeks)} week(s)")
+        self.results_grid.set_data(schedules, weeks)
         
         # Store schedules for export
         self.current_schedules = schedules
@@ -1040,68 +1488,14 @@ class CallSchedulerApp:
             return
         
         try:
-            wb = openpyxl.Workbook()
-            ws = wb.active
-            ws.title = "Call Schedules"
-            
-            # Headers
-            ws['A1'] = "Week"
-            ws['A2'] = "Week Start (Friday)"
-            
-            # Add schedule columns
-            for i, schedule in enumerate(self.current_schedules, 1):
-                col_letter = openpyxl.utils.get_column_letter(i + 1)
-                ws[f'{col_letter}1'] = f"Option {i}"
-            
-            # Add week data
-            for i, week in enumerate(self.current_weeks, 3):
-                week_date = datetime.strptime(week, '%Y-%m-%d')
-                week_display = week_date.strftime('%Y-%m-%d')
-                
-                ws[f'A{i}'] = f"Week {i-2}"
-                ws[f'B{i}'] = week_display
-                
-                # Add schedule data
-                for j, schedule in enumerate(self.current_schedules):
-                    col_letter = openpyxl.utils.get_column_letter(j + 2)
-                    if i-3 < len(schedule) and schedule[i-3]:
-                        if schedule[i-3][0] == "BLANK":
-                            ws[f'{col_letter}{i}'] = "BLANK"
-                            # Highlight blank cells
-                            ws[f'{col_letter}{i}'].fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
-                        else:
-                            ws[f'{col_letter}{i}'] = ', '.join(schedule[i-3])
-                    else:
-                        ws[f'{col_letter}{i}'] = "BLANK"
-                        ws[f'{col_letter}{i}'].fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
-            
-            # Format headers
-            header_font = Font(bold=True)
-            for cell in ws[1]:
-                cell.font = header_font
-            for cell in ws[2]:
-                cell.font = header_font
-            
-            # Auto-adjust column widths
-            for column in ws.columns:
-                max_length = 0
-                column_letter = openpyxl.utils.get_column_letter(column[0].column)
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column_letter].width = adjusted_width
-            
-            wb.save(filename)
+            write_schedules_xlsx(filename, self.current_schedules, self.current_weeks)
             messagebox.showinfo("Success", f"Schedule exported to {filename}")
             
         except Exception as e:
             messagebox.showerror("Error", f"Failed to export to Excel: {str(e)}")
 
 def main():
+    multiprocessing.freeze_support()
     root = tk.Tk()
     app = CallSchedulerApp(root)
     root.mainloop()
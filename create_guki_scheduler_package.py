@@ -162,6 +162,11 @@ The Windows executable is fully functional and ready to use!
 ### Option 2: Build on Windows Machine
 Copy these files to your Windows machine:
 - call_scheduler_optimized.py
+- schedule_engine.py
+- schedule_db.py
+- schedule_export.py
+- roster_import.py
+- roster_model.py
 - requirements.txt
 - build_executable.py
 
@@ -188,6 +193,8 @@ If you need help, contact your IT department.
         # Copy source files for Windows users
         if os.path.exists('call_scheduler_optimized.py'):
             shutil.copy2('call_scheduler_optimized.py', windows_dir)
+            for module in ('schedule_engine.py', 'schedule_db.py', 'schedule_export.py', 'roster_import.py', 'roster_model.py'):
+                shutil.copy2(module, windows_dir)
             print("✅ Copied source code")
         
         if os.path.exists('requirements.txt'):
@@ -227,6 +234,8 @@ pause
     # Copy source files for Windows users
     if os.path.exists('call_scheduler_optimized.py'):
         shutil.copy2('call_scheduler_optimized.py', windows_dir)
+        for module in ('schedule_engine.py', 'schedule_db.py', 'schedule_export.py', 'roster_import.py', 'roster_model.py'):
+            shutil.copy2(module, windows_dir)
         print("✅ Copied source code")
     
     if os.path.exists('requirements.txt'):
@@ -0,0 +1,160 @@
+"""Bulk import of groups, personnel and personnel excluded weeks from CSV or Excel.
+
+The first row names the columns; "Name" and "Group" are required and an
+"Excluded Weeks" column may list Friday dates (YYYY-MM-DD) separated by
+semicolons, commas or spaces. A person listed on several rows collects the
+exclusions from all of them. Rows with a group but no name just add the group.
+People already in the database are matched by name and only gain exclusions.
+"""
+
+import csv
+import re
+from datetime import date, datetime
+
+import openpyxl
+
+from schedule_engine import validate_date_format
+
+COLUMN_ALIASES = {
+    'name': 'name',
+    'personnel': 'name',
+    'group': 'group',
+    'excluded weeks': 'excluded',
+    'excluded_weeks': 'excluded',
+    'excluded': 'excluded',
+}
+
+# Report at most this many bad rows; the import is rejected either way
+MAX_REPORTED_ERRORS = 20
+
+class RosterImportError(ValueError):
+    """The file has rows that cannot be imported; nothing was written"""
+
+    def __init__(self, errors):
+        shown = errors[:MAX_REPORTED_ERRORS]
+        more = len(errors) - len(shown)
+        message = "\n".join(shown) + (f"\n... and {more} more" if more else "")
+        super().__init__(message)
+        self.errors = errors
+
+def iter_rows(filename):
+    """Yield the file's rows as lists of cell values, reading it as a stream"""
+    if filename.lower().endswith('.csv'):
+        with open(filename, newline='', encoding='utf-8-sig') as f:
+            yield from csv.reader(f)
+    else:
+        wb = openpyxl.load_workbook(filename, read_only=True, data_only=True)
+        try:
+            for row in wb.active.iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            wb.close()
+
+def parse_week(value):
+    """Week ordinal from a Friday given as a date cell or 'YYYY-MM-DD' text"""
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        if value.weekday() != 4:
+            raise ValueError(f"{value.isoformat()}: Date must be a Friday")
+        return value.toordinal()
+    valid, result = validate_date_format(value)
+    if not valid:
+        raise ValueError(f"{value}: {result}")
+    return result.toordinal()
+
+def parse_roster(rows):
+    """Read (groups, personnel, exclusions) from rows with a header row.
+
+    personnel maps name -> group name in file order; exclusions is a set of
+    (name, week ordinal). Raises RosterImportError listing every bad row.
+    """
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        raise RosterImportError(["The file is empty"])
+    columns = {}
+    for idx, title in enumerate(header):
+        key = COLUMN_ALIASES.get(str(title or '').strip().lower())
+        if key and key not in columns:
+            columns[key] = idx
+    if 'name' not in columns or 'group' not in columns:
+        raise RosterImportError(["The first row must have Name and Group columns"])
+
+    def cell(row, key):
+        idx = columns.get(key)
+        if idx is None or idx >= len(row) or row[idx] is None:
+            return ''
+        return row[idx]
+
+    groups = set()
+    personnel = {}
+    exclusions = set()
+    errors = []
+    for line, row in enumerate(rows, 2):
+        name = str(cell(row, 'name')).strip()
+        group_name = str(cell(row, 'group')).strip()
+        excluded = cell(row, 'excluded')
+        if not name and not group_name and not excluded:
+            continue
+        if group_name:
+            groups.add(group_name)
+        if not name:
+            if excluded:
+                errors.append(f"Row {line}: excluded weeks without a name")
+            continue
+        if group_name:
+            if personnel.get(name, group_name) not in (group_name, ''):
+                errors.append(f"Row {line}: {name} is already listed in group {personnel[name]}")
+                continue
+            personnel[name] = group_name
+        else:
+            personnel.setdefault(name, '')
+
+        values = [excluded] if isinstance(excluded, (date, datetime)) else re.split(r'[;,\s]+', str(excluded))
+        for value in values:
+            if value == '':
+                continue
+            try:
+                exclusions.add((name, parse_week(value)))
+            except ValueError as e:
+                errors.append(f"Row {line}: {e}")
+
+    if errors:
+        raise RosterImportError(errors)
+    return groups, personnel, exclusions
+
+def import_roster(cursor, rows):
+    """Insert the roster in rows using cursor's open transaction; return counts of what was added.
+
+    Groups and people are each resolved with a single query, and every insert is
+    one executemany, so the caller commits thousands of rows at once.
+    """
+    groups, personnel, exclusions = parse_roster(rows)
+
+    cursor.executemany("INSERT OR IGNORE INTO groups (name) VALUES (?)", [(name,) for name in sorted(groups)])
+    groups_added = max(cursor.rowcount, 0)
+    cursor.execute("SELECT name, id FROM groups")
+    group_ids = dict(cursor.fetchall())
+
+    cursor.execute("SELECT name, id FROM personnel")
+    person_ids = dict(cursor.fetchall())
+    missing_group = [name for name, group_name in personnel.items() if name not in person_ids and not group_name]
+    if missing_group:
+        raise RosterImportError([f"{name}: a group is required for new personnel" for name in missing_group])
+    new_personnel = [(name, group_ids[group_name]) for name, group_name in personnel.items()
+                     if name not in person_ids]
+    cursor.executemany("INSERT INTO personnel (name, group_id) VALUES (?, ?)", new_personnel)
+    if new_personnel:
+        cursor.execute("SELECT name, id FROM personnel")
+        person_ids = dict(cursor.fetchall())
+
+    cursor.executemany("INSERT OR IGNORE INTO personnel_excluded_weeks (personnel_id, week_start) VALUES (?, ?)",
+                       sorted((person_ids[name], week) for name, week in exclusions))
+    exclusions_added = max(cursor.rowcount, 0)
+
+    return {
+        'groups': groups_added,
+        'personnel': len(new_personnel),
+        'exclusions': exclusions_added,
+    }
@@ -0,0 +1,161 @@
+"""In-memory copy of the groups and personnel tables that tells the GUI what changed.
+
+The roster is read once; every write goes to the database and then patches the
+copy, and observers are called with just the ids that changed so views can
+update those rows instead of reloading everything.
+"""
+
+from bisect import bisect_left, insort
+
+def name_suffixes(name):
+    """Lowercased name from the start of each word; a search matches if one of them starts with it"""
+    folded = name.casefold()
+    return [folded] + [folded[idx + 1:] for idx, char in enumerate(folded)
+                       if char == ' ' and idx + 1 < len(folded)]
+
+class RosterModel:
+    """Groups and personnel kept in memory, sorted by name as the views show them.
+
+    Observers are called as observer(kind, action, ids) where kind is 'groups' or
+    'personnel', action is 'added', 'updated', 'deleted' or 'reset', and ids lists
+    the affected database ids (None for 'reset').
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.observers = []
+        self.groups = {}  # id -> name
+        self.personnel = {}  # id -> (name, group_id)
+        self.group_order = []  # sorted (name, id)
+        self.personnel_order = []  # sorted (name, id)
+        self.search_index = []  # sorted (name suffix, id), see name_suffixes
+
+    def subscribe(self, observer):
+        self.observers.append(observer)
+
+    def notify(self, kind, action, ids=None):
+        for observer in self.observers:
+            observer(kind, action, ids)
+
+    def load(self):
+        """Read the whole roster; observers rebuild their views once"""
+        cursor = self.db.connection().cursor()
+        cursor.execute("SELECT id, name FROM groups")
+        self.groups = dict(cursor.fetchall())
+        cursor.execute("SELECT id, name, group_id FROM personnel")
+        self.personnel = {person_id: (name, group_id) for person_id, name, group_id in cursor.fetchall()}
+        self.group_order = sorted((name, group_id) for group_id, name in self.groups.items())
+        self.personnel_order = sorted((name, person_id) for person_id, (name, _) in self.personnel.items())
+        self.search_index = sorted((suffix, person_id) for person_id, (name, _) in self.personnel.items()
+                                   for suffix in name_suffixes(name))
+        self.notify('groups', 'reset')
+        self.notify('personnel', 'reset')
+
+    # Reads
+
+    def group_names(self):
+        return [name for name, _ in self.group_order]
+
+    def group_id(self, name):
+        """Id of the group called name, or None"""
+        idx = bisect_left(self.group_order, (name,))
+        if idx < len(self.group_order) and self.group_order[idx][0] == name:
+            return self.group_order[idx][1]
+        return None
+
+    def group_index(self, group_id):
+        """Position of a group in name order"""
+        return bisect_left(self.group_order, (self.groups[group_id], group_id))
+
+    def group_row(self, group_id):
+        return (group_id, self.groups[group_id])
+
+    def personnel_count(self, group_id):
+        return sum(1 for _, person_group in self.personnel.values() if person_group == group_id)
+
+    def person_index(self, person_id):
+        """Position of a person in name order"""
+        return bisect_left(self.personnel_order, (self.personnel[person_id][0], person_id))
+
+    def person_id(self, name):
+        """Id of the person called name, or None"""
+        idx = bisect_left(self.personnel_order, (name,))
+        if idx < len(self.personnel_order) and self.personnel_order[idx][0] == name:
+            return self.personnel_order[idx][1]
+        return None
+
+    def person_row(self, person_id):
+        """(id, name, group name) as the personnel views show it"""
+        name, group_id = self.personnel[person_id]
+        return (person_id, name, self.groups.get(group_id))
+
+    def personnel_rows(self, person_ids=None):
+        """Rows in name order, only for person_ids when given"""
+        return [self.person_row(person_id) for _, person_id in self.personnel_order
+                if person_ids is None or person_id in person_ids]
+
+    def search_personnel(self, text):
+        """Ids of people with a word in their name starting with text (case-insensitive)"""
+        text = text.strip().casefold()
+        matches = set()
+        idx = bisect_left(self.search_index, (text,))
+        while idx < len(self.search_index) and self.search_index[idx][0].startswith(text):
+            matches.add(self.search_index[idx][1])
+            idx += 1
+        return matches
+
+    def person_labels(self, text='', limit=None):
+        """'Name (Group)' labels in name order for people matching text, at most limit of them"""
+        person_ids = self.search_personnel(text) if text.strip() else None
+        labels = []
+        for _, person_id in self.personnel_order:
+            if person_ids is None or person_id in person_ids:
+                _, name, group_name = self.person_row(person_id)
+                labels.append(f"{name} ({group_name})")
+                if limit is not None and len(labels) >= limit:
+                    break
+        return labels
+
+    # Writes: database first, then the in-memory copy, then observers
+
+    def add_group(self, name):
+        with self.db.transaction() as cursor:
+            cursor.execute("INSERT INTO groups (name) VALUES (?)", (name,))
+            group_id = cursor.lastrowid
+        self.groups[group_id] = name
+        insort(self.group_order, (name, group_id))
+        self.notify('groups', 'added', [group_id])
+        return group_id
+
+    def delete_group(self, group_id):
+        with self.db.transaction() as cursor:
+            cursor.execute("DELETE FROM groups WHERE id = ?", (group_id,))
+        self.group_order.pop(self.group_index(group_id))
+        del self.groups[group_id]
+        self.notify('groups', 'deleted', [group_id])
+
+    def add_personnel(self, name, group_id):
+        with self.db.transaction() as cursor:
+            cursor.execute("INSERT INTO personnel (name, group_id) VALUES (?, ?)", (name, group_id))
+            person_id = cursor.lastrowid
+        self.personnel[person_id] = (name, group_id)
+        insort(self.personnel_order, (name, person_id))
+        for suffix in name_suffixes(name):
+            insort(self.search_index, (suffix, person_id))
+        self.notify('personnel', 'added', [person_id])
+        return person_id
+
+    def delete_personnel(self, person_id):
+        with self.db.transaction() as cursor:
+            cursor.execute("DELETE FROM personnel WHERE id = ?", (person_id,))
+        self.personnel_order.pop(self.person_index(person_id))
+        for suffix in name_suffixes(self.personnel[person_id][0]):
+            self.search_index.pop(bisect_left(self.search_index, (suffix, person_id)))
+        del self.personnel[person_id]
+        self.notify('personnel', 'deleted', [person_id])
+
+    def reassign_personnel(self, person_id, group_id):
+        with self.db.transaction() as cursor:
+            cursor.execute("UPDATE personnel SET group_id = ? WHERE id = ?", (group_id, person_id))
+        self.personnel[person_id] = (self.personnel[person_id][0], group_id)
+        self.notify('personnel', 'updated', [person_id])
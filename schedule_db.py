@@ -0,0 +1,414 @@
+"""SQLite access shared by the GUI, batch mode and the server: schema, solver inputs and the solve cache"""
+
+import sqlite3
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# Total size of stored solve results before the least recently used are evicted
+SOLVE_CACHE_MAX_BYTES = 4 * 1024 * 1024
+
+# Weeks are stored as integer day ordinals (date.toordinal()) of their Friday
+EXCLUDED_WEEKS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS excluded_weeks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        week_start INTEGER NOT NULL
+    )
+'''
+PERSONNEL_EXCLUDED_WEEKS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS personnel_excluded_weeks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        personnel_id INTEGER,
+        week_start INTEGER NOT NULL,
+        FOREIGN KEY (personnel_id) REFERENCES personnel (id)
+    )
+'''
+SOLVE_CACHE_TABLE = '''
+    CREATE TABLE IF NOT EXISTS solve_cache (
+        fingerprint TEXT PRIMARY KEY,
+        start_week INTEGER NOT NULL,
+        end_week INTEGER NOT NULL,
+        result TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        last_used REAL NOT NULL
+    )
+'''
+
+# Finished generation runs; assignments are read only when a run is opened
+SCHEDULE_RUNS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS schedule_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        created_at REAL NOT NULL,
+        start_week INTEGER NOT NULL,
+        end_week INTEGER NOT NULL,
+        options INTEGER NOT NULL,
+        best_blanks INTEGER
+    )
+'''
+# One row per person on call in an option's week; BLANK weeks have no rows. Clustered
+# on run_id so opening a run reads one contiguous range however long the history gets
+SCHEDULE_ASSIGNMENTS_TABLE = '''
+    CREATE TABLE IF NOT EXISTS schedule_assignments (
+        run_id INTEGER NOT NULL,
+        option INTEGER NOT NULL,
+        week INTEGER NOT NULL,
+        slot INTEGER NOT NULL,
+        personnel_name TEXT NOT NULL,
+        PRIMARY KEY (run_id, option, week, slot)
+    ) WITHOUT ROWID
+'''
+
+# Sort orders for listing personnel excluded weeks; the trailing id makes every key unique
+EXCLUDED_WEEK_SORTS = {
+    'id': ('pew.id',),
+    'personnel': ('p.name', 'pew.week_start', 'pew.id'),
+    'week': ('pew.week_start', 'pew.id'),
+}
+EXCLUDED_WEEK_COLUMNS = ('pew.id', 'p.name', 'pew.week_start')
+
+# julianday() of a 'YYYY-MM-DD' date minus this offset is its date.toordinal()
+JULIAN_DAY_ORDINAL_OFFSET = 1721424.5
+
+def connect(db_path, cached_statements=256):
+    """Open a connection in WAL mode with the pragmas used throughout the app.
+
+    WAL lets readers run alongside a writer, and synchronous=NORMAL skips the fsync
+    on every commit (a crash can lose the last commits, never corrupt the file).
+    """
+    conn = sqlite3.connect(db_path, timeout=10, cached_statements=cached_statements, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-8000")
+    return conn
+
+class ConnectionManager:
+    """Long-lived connections to one database, one per thread, opened on first use.
+
+    Keeping connections open keeps SQLite's page cache and each connection's
+    prepared statement cache warm between edits.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.connections = []
+
+    def connection(self):
+        """This thread's connection"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = connect(self.db_path)
+            self.local.conn = conn
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Yield a cursor; commit when the block finishes, roll back if it raises"""
+        conn = self.connection()
+        try:
+            yield conn.cursor()
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def close(self):
+        """Close every thread's connection"""
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections = []
+        self.local = threading.local()
+
+def init_schema(conn):
+    """Create any missing tables and indexes"""
+    cursor = conn.cursor()
+
+    # Create groups table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS groups (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL
+        )
+    ''')
+
+    # Create personnel table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS personnel (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            group_id INTEGER,
+            FOREIGN KEY (group_id) REFERENCES groups (id)
+        )
+    ''')
+
+    # Create excluded weeks table
+    cursor.execute(EXCLUDED_WEEKS_TABLE)
+
+    # Create personnel excluded weeks table
+    cursor.execute(PERSONNEL_EXCLUDED_WEEKS_TABLE)
+
+    # Create solve cache tables: results keyed by a fingerprint of the solver inputs,
+    # plus which personnel each result depends on for targeted invalidation
+    cursor.execute(SOLVE_CACHE_TABLE)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS solve_cache_personnel (
+            fingerprint TEXT NOT NULL,
+            personnel_id INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_solve_cache_personnel ON solve_cache_personnel (personnel_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_solve_cache_fingerprint ON solve_cache_personnel (fingerprint)")
+
+    # Create schedule history tables
+    cursor.execute(SCHEDULE_RUNS_TABLE)
+    cursor.execute(SCHEDULE_ASSIGNMENTS_TABLE)
+
+    migrate_schema(cursor)
+    conn.commit()
+
+def migrate_schema(cursor):
+    """Bring databases created by earlier versions up to date, tracked in PRAGMA user_version"""
+    cursor.execute("PRAGMA user_version")
+    version = cursor.fetchone()[0]
+
+    if version < 1:
+        # Older versions could store the same exclusion twice; keep the first so the
+        # unique index can be built
+        cursor.execute('''
+            DELETE FROM personnel_excluded_weeks WHERE id NOT IN (
+                SELECT MIN(id) FROM personnel_excluded_weeks GROUP BY personnel_id, week_start
+            )
+        ''')
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_personnel_excluded_weeks_personnel_week
+            ON personnel_excluded_weeks (personnel_id, week_start)
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_personnel_group ON personnel (group_id)")
+        cursor.execute("PRAGMA user_version = 1")
+
+    if version < 2:
+        # Weeks were 'YYYY-MM-DD' text. A TEXT column would turn integers back into text,
+        # so the week tables are rebuilt with INTEGER columns and their rows converted
+        week_ordinal = f"""
+            CASE WHEN typeof(week_start) = 'text'
+                 THEN CAST(julianday(week_start) - {JULIAN_DAY_ORDINAL_OFFSET} AS INTEGER)
+                 ELSE week_start END
+        """
+        for table, create, columns in (('excluded_weeks', EXCLUDED_WEEKS_TABLE, 'id'),
+                                       ('personnel_excluded_weeks', PERSONNEL_EXCLUDED_WEEKS_TABLE,
+                                        'id, personnel_id')):
+            cursor.execute(f"ALTER TABLE {table} RENAME TO {table}_text")
+            cursor.execute(create)
+            cursor.execute(f"INSERT INTO {table} ({columns}, week_start) "
+                           f"SELECT {columns}, {week_ordinal} FROM {table}_text")
+            cursor.execute(f"DROP TABLE {table}_text")
+        cursor.execute('''
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_personnel_excluded_weeks_personnel_week
+            ON personnel_excluded_weeks (personnel_id, week_start)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_personnel_excluded_weeks_week
+            ON personnel_excluded_weeks (week_start)
+        ''')
+
+        # Cached solves are cheap to redo; start over with integer week columns
+        cursor.execute("DROP TABLE solve_cache")
+        cursor.execute(SOLVE_CACHE_TABLE)
+        cursor.execute("DELETE FROM solve_cache_personnel")
+        cursor.execute("PRAGMA user_version = 2")
+
+    if version < 3:
+        # Lets the excluded weeks list page through people in name order without sorting
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_personnel_name ON personnel (name)")
+        cursor.execute("PRAGMA user_version = 3")
+
+def load_solver_inputs(db_path, first_week=None, last_week=None):
+    """Read (personnel, personnel_excluded_weeks) from the database at db_path, migrating it first"""
+    conn = connect(db_path)
+    try:
+        init_schema(conn)
+        return read_solver_inputs(conn, first_week, last_week)
+    finally:
+        conn.close()
+
+def read_solver_inputs(conn, first_week=None, last_week=None):
+    """Read (personnel, personnel_excluded_weeks) in the form the solver expects.
+
+    With first_week and last_week (week ordinals) only exclusions in that range are read.
+    """
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT p.id, p.name, g.name
+        FROM personnel p
+        LEFT JOIN groups g ON p.group_id = g.id
+        ORDER BY p.name
+    ''')
+    personnel = cursor.fetchall()
+
+    # Get personnel excluded weeks
+    query = '''
+        SELECT p.name, pew.week_start
+        FROM personnel_excluded_weeks pew
+        JOIN personnel p ON pew.personnel_id = p.id
+    '''
+    params = []
+    if first_week is not None and last_week is not None:
+        query += " WHERE pew.week_start BETWEEN ? AND ?"
+        params = [first_week, last_week]
+    cursor.execute(query, params)
+    personnel_excluded_weeks = {}
+    for personnel_name, week_start in cursor.fetchall():
+        personnel_excluded_weeks.setdefault(personnel_name, []).append(week_start)
+    return personnel, personnel_excluded_weeks
+
+def read_personnel_excluded_weeks(conn, sort='personnel', descending=False, after=None, limit=200,
+                                  name_filter=None, personnel_id=None, week_range=None):
+    """One page of (id, personnel name, week ordinal) rows in the given sort order.
+
+    after is the sort key of the last row already read (excluded_week_sort_key), so
+    each page starts from an index seek instead of skipping over earlier rows.
+    name_filter keeps people with a word in their name starting with it (case-insensitive).
+    personnel_id and week_range (first, last week ordinal) narrow it to rows just written.
+    """
+    columns = EXCLUDED_WEEK_SORTS[sort]
+    query = f'''
+        SELECT {', '.join(EXCLUDED_WEEK_COLUMNS)}
+        FROM personnel_excluded_weeks pew
+        JOIN personnel p ON pew.personnel_id = p.id
+    '''
+    conditions = []
+    params = []
+    if name_filter:
+        escaped = name_filter.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        conditions.append("(p.name LIKE ? ESCAPE '\\' OR p.name LIKE ? ESCAPE '\\')")
+        params += [f"{escaped}%", f"% {escaped}%"]
+    if personnel_id is not None:
+        conditions.append("pew.personnel_id = ?")
+        params.append(personnel_id)
+    if week_range is not None:
+        conditions.append("pew.week_start BETWEEN ? AND ?")
+        params += list(week_range)
+    if after is not None:
+        placeholders = ', '.join('?' * len(columns))
+        conditions.append(f"({', '.join(columns)}) {'<' if descending else '>'} ({placeholders})")
+        params += list(after)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    direction = ' DESC' if descending else ''
+    query += f" ORDER BY {', '.join(column + direction for column in columns)} LIMIT ?"
+    params.append(limit)
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    return cursor.fetchall()
+
+def excluded_week_sort_key(row, sort):
+    """The key of a read_personnel_excluded_weeks row to pass as after"""
+    return tuple(row[EXCLUDED_WEEK_COLUMNS.index(column)] for column in EXCLUDED_WEEK_SORTS[sort])
+
+def load_cached_schedules(conn, fingerprint):
+    """Return the stored schedules for fingerprint and mark them recently used, or None"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT result FROM solve_cache WHERE fingerprint = ?", (fingerprint,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    cursor.execute("UPDATE solve_cache SET last_used = ? WHERE fingerprint = ?", (time.time(), fingerprint))
+    conn.commit()
+    return json.loads(row[0])
+
+def store_cached_schedules(conn, fingerprint, weeks, personnel_ids, schedules):
+    """Store a finished solve, then evict least recently used results beyond the size limit"""
+    if not schedules or not weeks:
+        return
+    result = json.dumps(schedules)
+    cursor = conn.cursor()
+    delete_cache_entries(cursor, [fingerprint])
+    cursor.execute('''
+        INSERT INTO solve_cache (fingerprint, start_week, end_week, result, size, last_used)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (fingerprint, weeks[0], weeks[-1], result, len(result), time.time()))
+    cursor.executemany("INSERT INTO solve_cache_personnel (fingerprint, personnel_id) VALUES (?, ?)",
+                       [(fingerprint, person_id) for person_id in personnel_ids])
+
+    cursor.execute("SELECT COALESCE(SUM(size), 0) FROM solve_cache")
+    total = cursor.fetchone()[0]
+    if total > SOLVE_CACHE_MAX_BYTES:
+        evicted = []
+        cursor.execute("SELECT fingerprint, size FROM solve_cache ORDER BY last_used")
+        for old_fingerprint, size in cursor.fetchall():
+            if total <= SOLVE_CACHE_MAX_BYTES:
+                break
+            evicted.append(old_fingerprint)
+            total -= size
+        delete_cache_entries(cursor, evicted)
+    conn.commit()
+
+def delete_cache_entries(cursor, fingerprints):
+    """Delete solve cache results and their personnel rows"""
+    rows = [(fingerprint,) for fingerprint in fingerprints]
+    cursor.executemany("DELETE FROM solve_cache WHERE fingerprint = ?", rows)
+    cursor.executemany("DELETE FROM solve_cache_personnel WHERE fingerprint = ?", rows)
+
+def save_schedule_run(conn, weeks, schedules):
+    """Store a finished run and all of its assignments in one transaction; return the run id"""
+    blanks = [sum(1 for week in schedule if not week or week[0] == "BLANK") for schedule in schedules]
+    cursor = conn.cursor()
+    cursor.execute('''
+        INSERT INTO schedule_runs (created_at, start_week, end_week, options, best_blanks)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (time.time(), weeks[0], weeks[-1], len(schedules), min(blanks, default=None)))
+    run_id = cursor.lastrowid
+    cursor.executemany(
+        "INSERT INTO schedule_assignments (run_id, option, week, slot, personnel_name) VALUES (?, ?, ?, ?, ?)",
+        [(run_id, option, week, slot, name)
+         for option, schedule in enumerate(schedules)
+         for week, assigned in zip(weeks, schedule)
+         if assigned and assigned[0] != "BLANK"
+         for slot, name in enumerate(assigned)])
+    conn.commit()
+    return run_id
+
+def list_schedule_runs(conn):
+    """(id, created_at, start_week, end_week, options, best_blanks) of every run, newest first"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT id, created_at, start_week, end_week, options, best_blanks
+        FROM schedule_runs ORDER BY id DESC
+    ''')
+    return cursor.fetchall()
+
+def load_schedule_run(conn, run_id):
+    """Read one run back as (weeks, schedules), or None if it no longer exists"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT start_week, end_week, options FROM schedule_runs WHERE id = ?", (run_id,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    start_week, end_week, options = row
+    weeks = list(range(start_week, end_week + 1, 7))
+    week_index = {week: idx for idx, week in enumerate(weeks)}
+    schedules = [[[] for _ in weeks] for _ in range(options)]
+    cursor.execute('''
+        SELECT option, week, personnel_name FROM schedule_assignments
+        WHERE run_id = ? ORDER BY option, week, slot
+    ''', (run_id,))
+    for option, week, name in cursor:
+        schedules[option][week_index[week]].append(name)
+    for schedule in schedules:
+        for idx, assigned in enumerate(schedule):
+            if not assigned:
+                schedule[idx] = ["BLANK"]
+    return weeks, schedules
+
+def delete_schedule_run(conn, run_id):
+    """Delete a run and its assignments"""
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM schedule_assignments WHERE run_id = ?", (run_id,))
+    cursor.execute("DELETE FROM schedule_runs WHERE id = ?", (run_id,))
+    conn.commit()
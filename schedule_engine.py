@@ -0,0 +1,923 @@
+"""Headless scheduling engine: rosters in, schedules out.
+
+Personnel are (id, name, group name) tuples, weeks are the integer day ordinals
+(date.toordinal()) of their Fridays and exclusions map a person's name to the
+weeks they cannot work. format_week turns a week into 'YYYY-MM-DD' for display.
+A schedule is a list with one [name] or ["BLANK"] entry per week. Nothing here
+imports tkinter or openpyxl, so batch jobs and services can use it directly.
+"""
+
+import re
+import random
+import multiprocessing
+import time
+import json
+import hashlib
+from datetime import date, datetime
+from bisect import insort
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+def validate_date_format(date_str):
+    """Validate date format and ensure it's a Friday"""
+    try:
+        # Check format
+        if not re.match(r'^\d{4}-\d{2}-\d{2}$', date_str):
+            return False, "Date must be in YYYY-MM-DD format"
+
+        # Parse date
+        date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
+
+        # Check if it's a Friday
+        if date_obj.weekday() != 4:  # Friday is 4
+            return False, "Date must be a Friday"
+
+        return True, date_obj
+    except ValueError:
+        return False, "Invalid date format"
+
+def get_schedule_weeks(start_date, end_date):
+    """Week ordinals from start_date through end_date"""
+    return list(range(start_date.toordinal(), end_date.toordinal() + 1, 7))
+
+def fridays_in_range(start_date, end_date):
+    """Week ordinals of every Friday from start_date through end_date (any weekdays)"""
+    first = start_date.toordinal() + (4 - start_date.weekday()) % 7
+    return list(range(first, end_date.toordinal() + 1, 7))
+
+def week_ordinal(week):
+    """Week ordinal of a date or a 'YYYY-MM-DD' string"""
+    if isinstance(week, str):
+        week = datetime.strptime(week, '%Y-%m-%d').date()
+    return week.toordinal()
+
+def format_week(week):
+    """'YYYY-MM-DD' for a week ordinal"""
+    return date.fromordinal(week).isoformat()
+
+def solve_cache_key(personnel, personnel_excluded_weeks, weeks, max_schedules, time_budget):
+    """Fingerprint of everything the solver reads; exclusions outside the period are ignored"""
+    week_set = set(weeks)
+    exclusions = {name: sorted(week for week in excluded if week in week_set)
+                  for name, excluded in personnel_excluded_weeks.items()}
+    inputs = {
+        'personnel': sorted(list(person) for person in personnel),
+        'exclusions': {name: excluded for name, excluded in exclusions.items() if excluded},
+        'weeks': [weeks[0], weeks[-1], len(weeks)] if weeks else [],
+        'max_schedules': max_schedules,
+        'time_budget': time_budget,
+    }
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+def iter_bits(mask):
+    """Yield the index of every set bit in mask, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+def popcount(mask):
+    """Number of set bits in mask"""
+    return bin(mask).count('1')
+
+class AvailabilityMatrix:
+    """Person x week availability as integer bitmasks, built once per generation run"""
+
+    def __init__(self, personnel, weeks, personnel_excluded_weeks, lower_bound=None):
+        self.personnel = list(personnel)
+        self.weeks = list(weeks)
+        week_index = {week: idx for idx, week in enumerate(self.weeks)}
+        all_weeks = (1 << len(self.weeks)) - 1
+
+        # Bit w of person_masks[p] is set when person p can work week w
+        self.person_masks = []
+        self.person_groups = []
+        group_index = {}
+        self.group_masks = []
+        for person_idx, (person_id, name, group_name) in enumerate(self.personnel):
+            excluded = 0
+            for week in personnel_excluded_weeks.get(name, ()):
+                if week in week_index:
+                    excluded |= 1 << week_index[week]
+            self.person_masks.append(all_weeks & ~excluded)
+
+            if group_name not in group_index:
+                group_index[group_name] = len(self.group_masks)
+                self.group_masks.append(0)
+            group_idx = group_index[group_name]
+            self.person_groups.append(group_idx)
+            self.group_masks[group_idx] |= 1 << person_idx
+
+        # Bit p of week_masks[w] is set when person p can work week w
+        self.week_masks = [0] * len(self.weeks)
+        for person_idx, mask in enumerate(self.person_masks):
+            for week_idx in iter_bits(mask):
+                self.week_masks[week_idx] |= 1 << person_idx
+
+        # People in the same group with the same availability are interchangeable:
+        # person_classes[p] is p's equivalence class, class_masks[c] its members
+        self.person_classes = []
+        self.class_masks = []
+        class_index = {}
+        for person_idx, mask in enumerate(self.person_masks):
+            key = (self.person_groups[person_idx], mask)
+            if key not in class_index:
+                class_index[key] = len(self.class_masks)
+                self.class_masks.append(0)
+            class_idx = class_index[key]
+            self.person_classes.append(class_idx)
+            self.class_masks[class_idx] |= 1 << person_idx
+        self.symmetric = len(self.class_masks) < len(self.personnel)
+
+        # group_cover[g][w] is the most weeks from w on that group g can cover: weeks
+        # some member can work, never two in a row
+        self.group_cover = []
+        for group_mask in self.group_masks:
+            weeks_mask = 0
+            for person_idx in iter_bits(group_mask):
+                weeks_mask |= self.person_masks[person_idx]
+            cover = [0] * (len(self.weeks) + 2)
+            for week_idx in range(len(self.weeks) - 1, -1, -1):
+                cover[week_idx] = cover[week_idx + 2] + 1 if weeks_mask >> week_idx & 1 else cover[week_idx + 1]
+            self.group_cover.append(cover)
+
+        self.schedulable = sum(1 for mask in self.person_masks if mask)
+        # Workers are handed the bound their parent already computed
+        self._lower_bound = lower_bound
+
+    def blank_lower_bound(self):
+        """BLANK weeks no schedule can avoid, from a maximum flow of weeks through people to groups.
+
+        The flow drops the adjacency of the group gap and keeps only its count, so it
+        is a relaxation: any schedule covers at most as many weeks as the flow does.
+        """
+        if self._lower_bound is None:
+            self._lower_bound = len(self.weeks) - self.max_coverage()
+        return self._lower_bound
+
+    def max_coverage(self):
+        """Maximum flow source -> week (1) -> person class (class size) -> group (group_cover) -> sink.
+
+        Interchangeable people share one node. Solved with Dinic's algorithm.
+        """
+        num_weeks = len(self.weeks)
+        num_classes = len(self.class_masks)
+        num_groups = len(self.group_masks)
+        first_class = num_weeks + 2
+        first_group = first_class + num_classes
+        source, sink = num_weeks, num_weeks + 1
+        heads = [[] for _ in range(first_group + num_groups)]
+        targets = []
+        capacities = []
+
+        def add_edge(node, target, capacity):
+            heads[node].append(len(targets))
+            targets.append(target)
+            capacities.append(capacity)
+            heads[target].append(len(targets))
+            targets.append(node)
+            capacities.append(0)
+
+        for week_idx in range(num_weeks):
+            add_edge(source, week_idx, 1)
+        for class_idx, members in enumerate(self.class_masks):
+            person_idx = members.bit_length() - 1
+            for week_idx in iter_bits(self.person_masks[person_idx]):
+                add_edge(week_idx, first_class + class_idx, 1)
+            add_edge(first_class + class_idx, first_group + self.person_groups[person_idx], popcount(members))
+        for group_idx in range(num_groups):
+            add_edge(first_group + group_idx, sink, self.group_cover[group_idx][0])
+
+        def bfs():
+            # Level nodes by distance from the source in the residual graph
+            level = [-1] * len(heads)
+            level[source] = 0
+            frontier = deque([source])
+            while frontier:
+                node = frontier.popleft()
+                for edge in heads[node]:
+                    if capacities[edge] and level[targets[edge]] < 0:
+                        level[targets[edge]] = level[node] + 1
+                        frontier.append(targets[edge])
+            return level
+
+        def augment(level, cursor):
+            # Walk one source-sink path along rising levels; every path carries one unit
+            path = []
+            node = source
+            while node != sink:
+                edges = heads[node]
+                while cursor[node] < len(edges):
+                    edge = edges[cursor[node]]
+                    if capacities[edge] and level[targets[edge]] == level[node] + 1:
+                        break
+                    cursor[node] += 1
+                else:
+                    # Dead end: step back and skip the edge that led here
+                    if node == source:
+                        return False
+                    node = targets[path.pop() ^ 1]
+                    cursor[node] += 1
+                    continue
+                path.append(edge)
+                node = targets[edge]
+            for edge in path:
+                capacities[edge] -= 1
+                capacities[edge ^ 1] += 1
+            return True
+
+        flow = 0
+        while True:
+            level = bfs()
+            if level[sink] < 0:
+                return flow
+            cursor = [0] * len(heads)
+            while augment(level, cursor):
+                flow += 1
+
+    def group_limits(self, week_idx, used=0):
+        """Per group, the most weeks from week_idx on it can still cover: no more than its
+        unused members, and no more than the group gap allows"""
+        return [min(popcount(group_mask & ~used), cover[week_idx])
+                for group_mask, cover in zip(self.group_masks, self.group_cover)]
+
+    def available(self, week_idx, used=0, blocked_group=None):
+        """Bitmask of unused personnel who can work week_idx outside blocked_group"""
+        mask = self.week_masks[week_idx] & ~used
+        if blocked_group is not None:
+            mask &= ~self.group_masks[blocked_group]
+        return mask
+
+    def used_mask(self, assignment):
+        """Bitmask of everyone scheduled in assignment"""
+        used = 0
+        for person_idx in assignment:
+            if person_idx is not None:
+                used |= 1 << person_idx
+        return used
+
+    def neighbor_groups(self, assignment, week_idx):
+        """Bitmask of everyone sharing a group with the people scheduled next to week_idx"""
+        mask = 0
+        for neighbor in (week_idx - 1, week_idx + 1):
+            if 0 <= neighbor < len(assignment) and assignment[neighbor] is not None:
+                mask |= self.group_masks[self.person_groups[assignment[neighbor]]]
+        return mask
+
+    def representatives(self, mask):
+        """Keep only the lowest-indexed person of each equivalence class in mask.
+
+        Members of a class can be swapped in any schedule without breaking a rule, so
+        trying one of them per week is enough; using them in index order means each
+        schedule is found once rather than once per permutation of their names.
+        """
+        if not self.symmetric:
+            return mask
+        kept = 0
+        while mask:
+            low = mask & -mask
+            kept |= low
+            mask &= ~self.class_masks[self.person_classes[low.bit_length() - 1]]
+        return kept
+
+    def names(self, assignment):
+        """Convert person indices (None for BLANK) to the schedule format used by the GUI"""
+        return [[self.personnel[p][1]] if p is not None else ["BLANK"] for p in assignment]
+
+class BacktrackingScheduler:
+    """Depth-first backtracking search with forward checking over the week x personnel domain"""
+
+    def __init__(self, matrix, seed=None, node_limit=200000, cancel_event=None, deadline=None,
+                 cancel_check_interval=0):
+        self.matrix = matrix
+        self.node_limit = node_limit
+        self.cancel_event = cancel_event
+        self.deadline = deadline
+        # A cross-process event costs a round trip to its manager, so it is polled at most this often
+        self.cancel_check_interval = cancel_check_interval
+        self.next_cancel_check = 0
+        self.cancelled = False
+        self.random = random.Random(seed)
+        self.nodes = 0
+        self.limit_reached = False
+
+    def should_stop(self):
+        """True once the cancel event is set or the deadline (time.monotonic) has passed"""
+        now = time.monotonic()
+        if self.cancel_event is not None and not self.cancelled and now >= self.next_cancel_check:
+            self.next_cancel_check = now + self.cancel_check_interval
+            try:
+                self.cancelled = self.cancel_event.is_set()
+            except (EOFError, OSError):
+                # The manager behind a cross-process event is gone: the run is over
+                self.cancelled = True
+        return self.cancelled or (self.deadline is not None and now >= self.deadline)
+
+    def reseed(self, seed=None):
+        """Change the random tie-breaking so the next solve explores a different branch order"""
+        self.random.seed(seed)
+
+    def solve(self, max_blanks):
+        """Find one assignment (person index per week, None for BLANK) with at most max_blanks
+        BLANK weeks, or None if the search fails"""
+        matrix = self.matrix
+        self.assignment = [None] * len(matrix.weeks)
+        self.nodes = 0
+        self.limit_reached = False
+
+        empty_weeks = sum(1 for mask in matrix.week_masks if not mask)
+        if matrix.blank_lower_bound() > max_blanks:
+            return None
+
+        if not self._search(0, 0, 0, empty_weeks, max_blanks):
+            return None
+        return list(self.assignment)
+
+    def solve_min_blanks(self):
+        """Find an assignment with the fewest BLANK weeks by raising the blank budget one week at a time.
+
+        Returns (assignment, blanks, proven). When proven is True no assignment with fewer
+        blanks exists; when the node limit stops the search assignment is None.
+        """
+        matrix = self.matrix
+        for max_blanks in range(matrix.blank_lower_bound(), len(matrix.weeks) + 1):
+            schedule = self.solve(max_blanks)
+            if schedule is not None:
+                return schedule, max_blanks, True
+            if self.limit_reached:
+                return None, max_blanks, False
+        return None, len(matrix.weeks), False
+
+    def _search(self, week_idx, used, blanks, empty_weeks, max_blanks):
+        """Assign week_idx and everything after it; empty_weeks counts unassigned weeks nobody can work"""
+        matrix = self.matrix
+        num_weeks = len(matrix.weeks)
+        if week_idx == num_weeks:
+            return True
+
+        # Stop early at the node limit, when the user cancels, or when time runs out
+        self.nodes += 1
+        if self.nodes > self.node_limit or (self.nodes & 63 == 0 and self.should_stop()):
+            self.limit_reached = True
+            return False
+
+        # Same group may not take call in consecutive weeks
+        previous = self.assignment[week_idx - 1] if week_idx else None
+        blocked = matrix.person_groups[previous] if previous is not None else None
+        candidates = list(iter_bits(matrix.representatives(matrix.available(week_idx, used, blocked))))
+
+        # Most constrained people first, random tie-breaking for variety between solves
+        later_weeks = week_idx + 1
+        self.random.shuffle(candidates)
+        candidates.sort(key=lambda p: popcount(matrix.person_masks[p] >> later_weeks))
+
+        weeks_left = num_weeks - later_weeks
+        # Weeks after this one the groups can still cover; taking someone from a group
+        # also keeps that group off the next week
+        limits = matrix.group_limits(later_weeks, used)
+        coverable = sum(limits)
+        for person_idx in candidates:
+            now_used = used | (1 << person_idx)
+
+            # Forward checking: count later weeks left with nobody available
+            newly_empty = 0
+            for offset in iter_bits(matrix.person_masks[person_idx] >> later_weeks):
+                if not matrix.week_masks[later_weeks + offset] & ~now_used:
+                    newly_empty += 1
+
+            # Prune when the empty weeks, weeks outnumbering the people left, or weeks
+            # outnumbering what the groups can cover, exceed the budget
+            people_left = matrix.schedulable - (later_weeks - blanks)
+            group_idx = matrix.person_groups[person_idx]
+            group_coverable = coverable - limits[group_idx] + min(
+                limits[group_idx], popcount(matrix.group_masks[group_idx] & ~now_used),
+                matrix.group_cover[group_idx][later_weeks + 1])
+            lower_bound = blanks + max(empty_weeks + newly_empty, weeks_left - people_left,
+                                       weeks_left - group_coverable)
+            self.assignment[week_idx] = person_idx
+            if (lower_bound <= max_blanks and
+                    self._search(later_weeks, now_used, blanks, empty_weeks + newly_empty, max_blanks)):
+                return True
+            self.assignment[week_idx] = None
+
+            if self.limit_reached:
+                return False
+
+        # Leave this week BLANK if the budget allows it
+        if not matrix.week_masks[week_idx] & ~used:
+            empty_weeks -= 1
+        people_left = matrix.schedulable - (week_idx - blanks)
+        if blanks + 1 + max(empty_weeks, weeks_left - people_left, weeks_left - coverable) > max_blanks:
+            return False
+        return self._search(later_weeks, used, blanks + 1, empty_weeks, max_blanks)
+
+class LocalSearchOptimizer:
+    """Fill BLANK weeks of an existing assignment with fill and ejection-chain moves.
+
+    A blank week is filled by an unused person when one fits. Otherwise a scheduled
+    person who fits is moved into it, which shifts the blank to the week they left,
+    and the walk continues from there until a shifted blank can be filled. Now and
+    then a scheduled person is swapped for an unused one to change who is free.
+    Every move is checked against the availability bitmasks in constant time.
+    """
+
+    def __init__(self, matrix, seed=None):
+        self.matrix = matrix
+        self.random = random.Random(seed)
+
+    def improve(self, assignment, max_moves=20000, lower_bound=0, should_stop=None):
+        """Return the assignment with the fewest BLANK weeks reached within max_moves"""
+        assignment = list(assignment)
+        used = self.matrix.used_mask(assignment)
+        where = {person_idx: week_idx for week_idx, person_idx in enumerate(assignment) if person_idx is not None}
+        blanks = [week_idx for week_idx, person_idx in enumerate(assignment) if person_idx is None]
+        best, best_blanks = list(assignment), len(blanks)
+        last_moved = None
+
+        for move in range(max_moves):
+            if len(blanks) <= lower_bound:
+                break
+            if should_stop and move & 255 == 0 and should_stop():
+                break
+
+            slot = self.random.randrange(len(blanks))
+            week_idx = blanks[slot]
+            week_mask = self.matrix.week_masks[week_idx]
+            blocked = self.matrix.neighbor_groups(assignment, week_idx)
+
+            # Fill move: an unused person who fits takes the week
+            free = week_mask & ~used & ~blocked
+            if free:
+                person_idx = self._random_bit(free)
+                assignment[week_idx] = person_idx
+                used |= 1 << person_idx
+                where[person_idx] = week_idx
+                blanks[slot] = blanks[-1]
+                blanks.pop()
+                if len(blanks) < best_blanks:
+                    best, best_blanks = list(assignment), len(blanks)
+                continue
+
+            # Ejection move: a scheduled person moves here and leaves their week blank
+            movable = (week_mask & used & ~blocked) | self._adjacent_movers(assignment, week_idx)
+            if last_moved is not None:
+                movable &= ~(1 << last_moved)
+            if movable and self.random.random() >= 0.1:
+                person_idx = self._random_bit(movable)
+                old_week = where[person_idx]
+                assignment[old_week] = None
+                assignment[week_idx] = person_idx
+                where[person_idx] = week_idx
+                blanks[slot] = old_week
+                last_moved = person_idx
+                continue
+
+            # Swap move: an unused person replaces someone at a random scheduled week
+            other_week = self.random.randrange(len(assignment))
+            current = assignment[other_week]
+            if current is None:
+                continue
+            replacements = (self.matrix.week_masks[other_week] & ~used &
+                            ~self.matrix.neighbor_groups(assignment, other_week))
+            if not replacements:
+                continue
+            person_idx = self._random_bit(replacements)
+            assignment[other_week] = person_idx
+            used = (used & ~(1 << current)) | (1 << person_idx)
+            del where[current]
+            where[person_idx] = other_week
+            last_moved = person_idx
+
+        return best
+
+    def _adjacent_movers(self, assignment, week_idx):
+        """People next to week_idx who could shift into it (their own group no longer blocks them)"""
+        matrix = self.matrix
+        mask = 0
+        for neighbor, other in ((week_idx - 1, week_idx + 1), (week_idx + 1, week_idx - 1)):
+            if not 0 <= neighbor < len(assignment) or assignment[neighbor] is None:
+                continue
+            person_idx = assignment[neighbor]
+            if not matrix.week_masks[week_idx] >> person_idx & 1:
+                continue
+            if (0 <= other < len(assignment) and assignment[other] is not None and
+                    matrix.person_groups[assignment[other]] == matrix.person_groups[person_idx]):
+                continue
+            mask |= 1 << person_idx
+        return mask
+
+    def _random_bit(self, mask):
+        return self.random.choice(list(iter_bits(mask)))
+
+class ScheduleRepairer:
+    """Repair an existing assignment after exclusions or groups change, moving as little as possible.
+
+    Weeks whose person can no longer work them are cleared and, like any BLANK week,
+    refilled with an unused person when one fits. A week that cannot be refilled is re-solved together with a
+    window of neighbouring weeks, widened one week at a time up to max_radius, trying
+    each week's original person first.
+    """
+
+    def __init__(self, matrix, node_limit=20000):
+        self.matrix = matrix
+        self.node_limit = node_limit
+
+    def conflicts(self, assignment):
+        """Weeks whose person is now excluded or shares a group with the previous week's person"""
+        matrix = self.matrix
+        broken = []
+        previous = None
+        for week_idx, person_idx in enumerate(assignment):
+            if person_idx is None:
+                previous = None
+                continue
+            if (not matrix.week_masks[week_idx] >> person_idx & 1 or
+                    (previous is not None and matrix.person_groups[previous] == matrix.person_groups[person_idx])):
+                broken.append(week_idx)
+                previous = None
+            else:
+                previous = person_idx
+        return broken
+
+    def repair(self, assignment, max_radius=4):
+        """Return (repaired assignment, indices of the weeks that changed)"""
+        matrix = self.matrix
+        original = list(assignment)
+        repaired = list(original)
+        broken = self.conflicts(repaired)
+        for week_idx in broken:
+            repaired[week_idx] = None
+
+        # Refill each broken or BLANK week in place when an unused person fits
+        used = matrix.used_mask(repaired)
+        for week_idx in [week_idx for week_idx, person_idx in enumerate(repaired) if person_idx is None]:
+            fits = matrix.week_masks[week_idx] & ~used & ~matrix.neighbor_groups(repaired, week_idx)
+            if fits:
+                person_idx = next(iter_bits(fits))
+                repaired[week_idx] = person_idx
+                used |= 1 << person_idx
+
+        # Otherwise re-solve the smallest window around it that restores the coverage
+        for week_idx in broken:
+            if repaired[week_idx] is not None:
+                continue
+            for radius in range(1, max_radius + 1):
+                first = max(0, week_idx - radius)
+                last = min(len(repaired) - 1, week_idx + radius)
+                window = self._solve_window(repaired, original, first, last)
+                if window is not None:
+                    repaired[first:last + 1] = window
+                    break
+
+        changed = [week_idx for week_idx in range(len(original)) if repaired[week_idx] != original[week_idx]]
+        return repaired, changed
+
+    def _solve_window(self, repaired, original, first, last):
+        """Reassign weeks first..last with no more BLANKs than the original had there, or None"""
+        matrix = self.matrix
+        outside = repaired[:first] + [None] * (last - first + 1) + repaired[last + 1:]
+        used = matrix.used_mask(outside)
+        max_blanks = sum(1 for person_idx in original[first:last + 1] if person_idx is None)
+        after = repaired[last + 1] if last + 1 < len(repaired) else None
+        window = []
+        nodes = [0]
+
+        def search(week_idx, used, blanks):
+            if week_idx > last:
+                return True
+            nodes[0] += 1
+            if nodes[0] > self.node_limit:
+                return False
+
+            previous = window[-1] if window else (repaired[first - 1] if first else None)
+            available = matrix.available(week_idx, used,
+                                         matrix.person_groups[previous] if previous is not None else None)
+            if week_idx == last and after is not None:
+                available &= ~matrix.group_masks[matrix.person_groups[after]]
+
+            # Keep the original person where possible so the published schedule moves little
+            candidates = list(iter_bits(available))
+            candidates.sort(key=lambda p: (p != original[week_idx], p != repaired[week_idx]))
+            for person_idx in candidates:
+                window.append(person_idx)
+                if search(week_idx + 1, used | (1 << person_idx), blanks):
+                    return True
+                window.pop()
+
+            if blanks < max_blanks:
+                window.append(None)
+                if search(week_idx + 1, used, blanks + 1):
+                    return True
+                window.pop()
+            return False
+
+        return window if search(first, used, 0) else None
+
+def search_schedules_worker(personnel, weeks, personnel_excluded_weeks, blank_budget, seed, attempts,
+                            time_limit=None, stop_event=None, lower_bound=None):
+    """Process pool entry point: run several seeded searches and return every assignment found.
+
+    stop_event (a multiprocessing.Manager Event) ends the batch early once the run is over.
+    """
+    deadline = time.monotonic() + time_limit if time_limit is not None else None
+    solver = BacktrackingScheduler(AvailabilityMatrix(personnel, weeks, personnel_excluded_weeks, lower_bound),
+                                   seed=seed, cancel_event=stop_event, deadline=deadline,
+                                   cancel_check_interval=0.005)
+    assignments = []
+    for _ in range(attempts):
+        assignment = solver.solve(blank_budget)
+        if assignment:
+            assignments.append(assignment)
+        if solver.should_stop():
+            break
+    return assignments
+
+def solve_budget_worker(personnel, weeks, personnel_excluded_weeks, max_blanks, lower_bound=None, stop_event=None):
+    """Process pool entry point: one search at max_blanks, returning (assignment or None, limit_reached)"""
+    solver = BacktrackingScheduler(AvailabilityMatrix(personnel, weeks, personnel_excluded_weeks, lower_bound),
+                                   cancel_event=stop_event, cancel_check_interval=0.005)
+    assignment = solver.solve(max_blanks)
+    return assignment, solver.limit_reached
+
+def solve_min_blanks_parallel(executor, workers, personnel, weeks, personnel_excluded_weeks, lower_bound,
+                              stop_event, should_stop=None):
+    """solve_min_blanks with the budgets lower_bound, lower_bound + 1, ... searched side by side in executor.
+
+    Returns (assignment, blanks, proven) as BacktrackingScheduler.solve_min_blanks does:
+    the answer is the smallest budget that succeeds once every smaller one has failed
+    outright. stop_event is set on return so searches still running give up.
+    """
+    results = {}  # budget -> (assignment or None, limit_reached)
+    running = {}  # future -> budget
+    next_budget = lower_bound
+    best = None  # smallest budget that succeeded so far
+    try:
+        while True:
+            # Settle what the finished budgets prove, lowest first
+            budget = lower_bound
+            while budget in results:
+                assignment, limit_reached = results[budget]
+                if assignment is not None:
+                    return assignment, budget, True
+                if limit_reached:
+                    return None, budget, False
+                budget += 1
+            if budget > len(weeks) or (should_stop and should_stop()):
+                return None, budget, False
+
+            # Budgets above one that already succeeded cannot be the answer
+            while len(running) < workers and next_budget <= len(weeks) and (best is None or next_budget < best):
+                running[executor.submit(solve_budget_worker, personnel, weeks, personnel_excluded_weeks,
+                                        next_budget, lower_bound, stop_event)] = next_budget
+                next_budget += 1
+            done, _ = wait(running, timeout=0.05, return_when=FIRST_COMPLETED)
+            for future in done:
+                budget = running.pop(future)
+                results[budget] = future.result()
+                if results[budget][0] is not None and (best is None or budget < best):
+                    best = budget
+    finally:
+        for future in running:
+            future.cancel()
+        stop_event.set()
+
+def schedule_fingerprint(assignment, person_classes=None):
+    """Hashable key for an assignment: the compact tuple of person indices per week.
+
+    With person_classes the key uses equivalence classes instead, so assignments that
+    only permute interchangeable people share a key.
+    """
+    if person_classes is not None:
+        return tuple(-1 if person_idx is None else person_classes[person_idx] for person_idx in assignment)
+    return tuple(-1 if person_idx is None else person_idx for person_idx in assignment)
+
+class SchedulePool:
+    """The best distinct assignments seen so far, ranked by fewest BLANK weeks.
+
+    With person_classes (see AvailabilityMatrix), assignments that differ only by
+    swapping interchangeable people count as the same schedule.
+    """
+
+    def __init__(self, size, person_classes=None):
+        self.size = size
+        self.person_classes = person_classes
+        self.entries = []  # (blanks, arrival order, assignment), kept sorted
+        self.seen = set()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def offer(self, assignment):
+        """Add assignment if it is new and ranks within the pool; return True when the pool changed"""
+        fingerprint = schedule_fingerprint(assignment, self.person_classes)
+        if fingerprint in self.seen:
+            return False
+        self.seen.add(fingerprint)
+
+        blanks = assignment.count(None)
+        if self.full() and blanks >= self.entries[-1][0]:
+            return False
+        insort(self.entries, (blanks, len(self.seen), assignment))
+        del self.entries[self.size:]
+        return True
+
+    def full(self):
+        return len(self.entries) >= self.size
+
+    def best_blanks(self):
+        return self.entries[0][0] if self.entries else None
+
+    def worst_blanks(self):
+        return self.entries[-1][0] if self.entries else None
+
+    def assignments(self):
+        return [assignment for _, _, assignment in self.entries]
+
+def generate_valid_schedules(personnel, weeks, personnel_excluded_weeks, workers=1, cancel_event=None,
+                             progress=None, max_schedules=10, time_budget=None, executor=None):
+    """Generate valid schedules based on rules, using as few BLANK weeks as possible.
+
+    The search stops early once cancel_event is set. progress, if given, is called
+    with a dict of attempts, schedules found, the best BLANK count so far and the
+    matching lower bound on BLANK weeks; the first call comes before any search.
+    With time_budget (seconds) the search runs in anytime mode: it keeps improving
+    a ranked pool until the budget is spent or the pool reaches the lower bound,
+    and progress events that follow an improvement carry the ranked schedules
+    under 'pool'.
+
+    With workers > 1 the searches run in executor, a ProcessPoolExecutor the caller
+    keeps warm between runs; without one a pool is started for this call only.
+    """
+    # Availability is computed once and shared by every strategy below
+    matrix = AvailabilityMatrix(personnel, weeks, personnel_excluded_weeks)
+    # Options that only swap interchangeable people are not counted twice
+    pool = SchedulePool(max_schedules, matrix.person_classes)
+    started = time.monotonic()
+    deadline = started + time_budget if time_budget else None
+    solver = BacktrackingScheduler(matrix, cancel_event=cancel_event, deadline=deadline)
+    attempts = 0
+    max_attempts = max(200, 20 * max_schedules)
+
+    def report(include_pool=False):
+        event = {
+            'attempts': attempts,
+            'max_attempts': max_attempts,
+            'schedules': len(pool),
+            'max_schedules': max_schedules,
+            'best_blanks': pool.best_blanks(),
+            'lower_bound': lower_bound,
+            'elapsed': time.monotonic() - started,
+            'time_budget': time_budget,
+        }
+        if include_pool:
+            event['pool'] = [matrix.names(assignment) for assignment in pool.assignments()]
+        progress(event)
+
+    # Report unavoidable BLANK weeks before spending any time searching
+    lower_bound = matrix.blank_lower_bound()
+    if progress:
+        report()
+
+    pending = set()
+    seed = random.randrange(1 << 30)
+    owned_executor = None
+    manager = stop_event = None
+    if workers <= 1:
+        executor = None
+    improved = True
+    last_report = 0
+
+    try:
+        if executor is None and workers > 1:
+            executor = owned_executor = ProcessPoolExecutor(max_workers=workers)
+        if executor is not None:
+            # Tells batches already running in the workers to stop when this run ends
+            manager = multiprocessing.Manager()
+            stop_event = manager.Event()
+
+        if deadline is None:
+            # Find the smallest blank budget with the backtracking search, one budget per worker
+            if executor is not None:
+                assignment, blank_budget, _ = solve_min_blanks_parallel(
+                    executor, workers, personnel, weeks, personnel_excluded_weeks, lower_bound,
+                    manager.Event(), solver.should_stop)
+            else:
+                assignment, blank_budget, _ = solver.solve_min_blanks()
+            if assignment is not None:
+                pool.offer(assignment)
+
+        optimizer = LocalSearchOptimizer(matrix)
+        order = list(range(len(matrix.personnel)))
+
+        def greedy_with_local_search():
+            random.shuffle(order)
+            return optimizer.improve(try_create_schedule(matrix, order), lower_bound=lower_bound,
+                                     should_stop=solver.should_stop)
+
+        if not pool and not solver.should_stop():
+            # Anytime mode, or the search limit was reached: greedy passes polished by
+            # local search give a good first answer fast
+            for _ in range(20):
+                pool.offer(greedy_with_local_search())
+            blank_budget = pool.best_blanks()
+
+        # Re-run the search with different tie-breaking for distinct options
+        while not solver.should_stop():
+            if deadline is None:
+                if pool.full() or (attempts >= max_attempts and not pending):
+                    break
+            else:
+                # A full pool at the lower bound is provably optimal
+                if pool.full() and pool.worst_blanks() <= lower_bound:
+                    break
+                # Fill the pool at the best count, then push out its worst entries
+                blank_budget = pool.worst_blanks() - 1 if pool.full() else pool.best_blanks()
+
+            found = []
+            if executor:
+                # Keep every worker busy with a small batch under its own seed
+                batch = 5
+                time_limit = deadline - time.monotonic() if deadline is not None else None
+                while len(pending) < workers and (deadline is not None or attempts < max_attempts):
+                    pending.add(executor.submit(search_schedules_worker, personnel, weeks, personnel_excluded_weeks,
+                                                blank_budget, seed + attempts, batch, time_limit, stop_event,
+                                                lower_bound))
+                    attempts += batch
+                done, pending = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+                found.extend(assignment for future in done for assignment in future.result())
+            else:
+                attempts += 1
+                solver.reseed()
+                assignment = solver.solve(blank_budget)
+                if assignment is None and not solver.limit_reached and pool.full() and deadline is not None:
+                    # Proven: nothing beats the pool's worst entry, so the pool is optimal
+                    break
+                if assignment is None and deadline is not None and not solver.should_stop():
+                    # The search gave up on this target; local search may still reach it
+                    assignment = greedy_with_local_search()
+                found.append(assignment)
+
+            for assignment in found:
+                if assignment and pool.offer(assignment):
+                    improved = True
+
+            now = time.monotonic()
+            if progress and (improved or now - last_report >= 0.1):
+                report(include_pool=improved and deadline is not None)
+                improved = False
+                last_report = now
+    finally:
+        # Drop queued batches and stop the running ones, also when a worker failed,
+        # so a warm executor is free for the next run
+        for future in pending:
+            future.cancel()
+        if manager is not None:
+            stop_event.set()
+            wait(pending, timeout=1)
+            manager.shutdown()
+        if owned_executor is not None:
+            owned_executor.shutdown(wait=False)
+
+    return [matrix.names(assignment) for assignment in pool.assignments()]
+
+def try_create_schedule(matrix, order):
+    """Greedy pass: give each week to the first available person in order (None for BLANK)"""
+    assignment = []
+    used = 0
+    previous = None
+
+    for week_idx in range(len(matrix.weeks)):
+        # Unused, not excluded, and not from last week's group
+        blocked = matrix.person_groups[previous] if previous is not None else None
+        available = matrix.available(week_idx, used, blocked)
+
+        previous = None
+        for person_idx in order:
+            if available >> person_idx & 1:
+                previous = person_idx
+                used |= 1 << person_idx
+                break
+
+        # No available personnel leaves the week BLANK
+        assignment.append(previous)
+
+    return assignment
+
+def repair_valid_schedules(personnel, weeks, personnel_excluded_weeks, schedules):
+    """Repair each schedule in place; return (repaired schedules, total weeks changed)"""
+    matrix = AvailabilityMatrix(personnel, weeks, personnel_excluded_weeks)
+    repairer = ScheduleRepairer(matrix)
+    person_index = {person[1]: person_idx for person_idx, person in enumerate(matrix.personnel)}
+
+    repaired_schedules = []
+    changed_weeks = 0
+    for schedule in schedules:
+        # People no longer on the roster leave their weeks to be repaired
+        assignment = [person_index.get(week[0]) if week and week[0] != "BLANK" else None
+                      for week in schedule]
+        repaired, _ = repairer.repair(assignment)
+        repaired_schedule = matrix.names(repaired)
+        changed_weeks += sum(1 for week_idx, week in enumerate(repaired_schedule)
+                             if list(schedule[week_idx] or ["BLANK"]) != week)
+        repaired_schedules.append(repaired_schedule)
+    return repaired_schedules, changed_weeks
@@ -0,0 +1,74 @@
+"""Write generated schedules to Excel or CSV; shared by the GUI, batch mode and the server.
+
+Both formats use the same layout: one row per week with its label and Friday
+start date, then one column per schedule option.
+"""
+
+import csv
+import io
+import openpyxl
+from openpyxl.styles import Font, PatternFill
+
+from schedule_engine import format_week
+
+BLANK_FILL = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
+
+def schedule_rows(schedules, weeks):
+    """Yield the header row and then one row per week"""
+    yield ["Week", "Week Start (Friday)"] + [f"Option {i}" for i in range(1, len(schedules) + 1)]
+    for week_idx, week in enumerate(weeks):
+        row = [f"Week {week_idx + 1}", format_week(week)]
+        for schedule in schedules:
+            if week_idx < len(schedule) and schedule[week_idx]:
+                row.append(', '.join(schedule[week_idx]))
+            else:
+                row.append("BLANK")
+        yield row
+
+def write_schedules_csv(filename, schedules, weeks):
+    """Write schedules to a CSV file"""
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(schedule_rows(schedules, weeks))
+
+def write_schedules_xlsx(filename, schedules, weeks):
+    """Write schedules to an Excel file (or binary file object) with BLANK weeks highlighted"""
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Call Schedules"
+
+    for row in schedule_rows(schedules, weeks):
+        ws.append(row)
+
+    # Format headers and highlight blank cells
+    header_font = Font(bold=True)
+    for cell in ws[1]:
+        cell.font = header_font
+    for row in ws.iter_rows(min_row=2, min_col=3):
+        for cell in row:
+            if cell.value == "BLANK":
+                cell.fill = BLANK_FILL
+
+    # Auto-adjust column widths
+    for column in ws.columns:
+        max_length = max(len(str(cell.value)) for cell in column if cell.value is not None)
+        column_letter = openpyxl.utils.get_column_letter(column[0].column)
+        ws.column_dimensions[column_letter].width = min(max_length + 2, 50)
+
+    wb.save(filename)
+
+def write_schedules(filename, schedules, weeks):
+    """Write schedules in the format given by the file extension (.csv, otherwise Excel)"""
+    if filename.lower().endswith('.csv'):
+        write_schedules_csv(filename, schedules, weeks)
+    else:
+        write_schedules_xlsx(filename, schedules, weeks)
+
+def schedules_to_bytes(schedules, weeks, file_format):
+    """File contents for schedules as 'csv' or 'xlsx', for sending without a temporary file"""
+    if file_format == 'csv':
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(schedule_rows(schedules, weeks))
+        return buffer.getvalue().encode('utf-8')
+    buffer = io.BytesIO()
+    write_schedules_xlsx(buffer, schedules, weeks)
+    return buffer.getvalue()
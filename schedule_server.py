@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Local HTTP/JSON scheduling service over one or more call_schedule.db files.
+
+    python schedule_server.py cardiology.db surgery.db --port 8765
+
+Each database is addressed by its file name without extension. Endpoints
+(all POST with a JSON body, except /health):
+
+    /generate  {"database", "start", "end", "max_schedules"?, "time_budget"?}
+               -> {"weeks", "schedules", "blanks", "cached", "elapsed"}
+    /repair    {"database", "weeks", "schedules"}
+               -> {"schedules", "blanks", "changed_weeks"}
+    /export    {"weeks", "schedules", "format"?: "xlsx" | "csv"}
+               or the /generate fields plus "format" -> file contents
+    /health    -> {"databases": [...]}
+
+Solves run in a process pool that stays warm between requests. Each database
+keeps one open connection, results are stored in its solve cache like the
+GUI's, and identical requests arriving together share a single solve.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from schedule_engine import (validate_date_format, get_schedule_weeks, week_ordinal, format_week,
+                             solve_cache_key, generate_valid_schedules, repair_valid_schedules)
+from schedule_db import connect, init_schema, read_solver_inputs, load_cached_schedules, store_cached_schedules
+from schedule_export import schedules_to_bytes
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+
+EXPORT_TYPES = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv; charset=utf-8',
+}
+
+class RequestError(Exception):
+    """A client error, reported with its HTTP status"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+def count_blanks(schedules):
+    return [sum(1 for week in schedule if week[0] == "BLANK") for schedule in schedules]
+
+class ScheduleService:
+    """Request handling shared by every connection: open databases, worker pool and in-flight solves"""
+
+    def __init__(self, databases, workers):
+        self.databases = databases  # name -> path
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.connections = {}
+        self.in_flight = {}
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        for conn in self.connections.values():
+            conn.close()
+
+    def connection(self, body):
+        """The open connection for the database named in the request"""
+        name = body.get('database')
+        if name is None and len(self.databases) == 1:
+            name = next(iter(self.databases))
+        if name not in self.databases:
+            raise RequestError(f"unknown database: {name}", 404)
+        if name not in self.connections:
+            # Only the event loop thread touches connections, so one per database is enough
+            conn = connect(self.databases[name])
+            init_schema(conn)
+            self.connections[name] = conn
+        return self.connections[name]
+
+    async def run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def generate(self, body):
+        started = time.perf_counter()
+        conn = self.connection(body)
+        start_date, end_date = parse_range(body)
+        max_schedules = max(1, int(body.get('max_schedules', 10)))
+        time_budget = max(0, float(body.get('time_budget', 0)))
+
+        weeks = get_schedule_weeks(start_date, end_date)
+        personnel, personnel_excluded_weeks = read_solver_inputs(conn, weeks[0], weeks[-1])
+        if not personnel:
+            raise RequestError("No personnel found")
+
+        # Reuse a stored result, or join a solve of the same inputs that is already running
+        fingerprint = solve_cache_key(personnel, personnel_excluded_weeks, weeks, max_schedules, time_budget)
+        schedules = load_cached_schedules(conn, fingerprint)
+        cached = schedules is not None
+        if not cached:
+            key = (id(conn), fingerprint)
+            solve = self.in_flight.get(key)
+            if solve is None:
+                solve = self.in_flight[key] = asyncio.ensure_future(self.solve_and_store(
+                    conn, fingerprint, personnel, weeks, personnel_excluded_weeks, max_schedules, time_budget))
+                solve.add_done_callback(lambda _: self.in_flight.pop(key, None))
+            # A client hanging up does not cancel a solve other requests are waiting on
+            schedules = await asyncio.shield(solve)
+
+        return {
+            'weeks': [format_week(week) for week in weeks],
+            'schedules': schedules,
+            'blanks': count_blanks(schedules),
+            'cached': cached,
+            'elapsed': time.perf_counter() - started,
+        }
+
+    async def solve_and_store(self, conn, fingerprint, personnel, weeks, personnel_excluded_weeks,
+                              max_schedules, time_budget):
+        schedules = await self.run(generate_valid_schedules, personnel, weeks, personnel_excluded_weeks,
+                                   1, None, None, max_schedules, time_budget)
+        store_cached_schedules(conn, fingerprint, weeks, [person[0] for person in personnel], schedules)
+        return schedules
+
+    async def repair(self, body):
+        conn = self.connection(body)
+        weeks, schedules = parse_weeks(body.get('weeks')), body.get('schedules')
+        if not isinstance(schedules, list):
+            raise RequestError("schedules are required")
+        personnel, personnel_excluded_weeks = read_solver_inputs(conn, weeks[0], weeks[-1])
+        repaired, changed_weeks = await self.run(repair_valid_schedules, personnel, weeks,
+                                                 personnel_excluded_weeks, schedules)
+        return {'schedules': repaired, 'blanks': count_blanks(repaired), 'changed_weeks': changed_weeks}
+
+    async def export(self, body):
+        file_format = body.get('format', 'xlsx')
+        if file_format not in EXPORT_TYPES:
+            raise RequestError("format must be xlsx or csv")
+        if 'schedules' in body:
+            schedules = body['schedules']
+            if not isinstance(schedules, list):
+                raise RequestError("schedules must be a list")
+        else:
+            result = await self.generate(body)
+            body['weeks'], schedules = result['weeks'], result['schedules']
+        weeks = parse_weeks(body.get('weeks'))
+        content = await self.run(schedules_to_bytes, schedules, weeks, file_format)
+        return EXPORT_TYPES[file_format], content
+
+    async def health(self, body):
+        return {'databases': sorted(self.databases)}
+
+    ROUTES = {
+        ('POST', '/generate'): 'generate',
+        ('POST', '/repair'): 'repair',
+        ('POST', '/export'): 'export',
+        ('GET', '/health'): 'health',
+    }
+
+    async def handle_request(self, method, path, raw_body):
+        """Return (status, content type, body bytes) for one request"""
+        route = self.ROUTES.get((method, path.split('?', 1)[0]))
+        if route is None:
+            return 404, 'application/json', json.dumps({'error': f"no route for {method} {path}"}).encode()
+        try:
+            body = json.loads(raw_body) if raw_body else {}
+            if not isinstance(body, dict):
+                raise RequestError("request body must be a JSON object")
+            result = await getattr(self, route)(body)
+        except RequestError as e:
+            return e.status, 'application/json', json.dumps({'error': str(e)}).encode()
+        except (ValueError, TypeError, KeyError, IndexError) as e:
+            return 400, 'application/json', json.dumps({'error': str(e)}).encode()
+        except Exception as e:
+            return 500, 'application/json', json.dumps({'error': str(e)}).encode()
+
+        if isinstance(result, tuple):
+            return (200,) + result
+        return 200, 'application/json', json.dumps(result).encode()
+
+    async def handle_connection(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection until the client closes it"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, path, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get('content-length', 0))
+                if length > MAX_BODY_BYTES:
+                    await self.respond(writer, 413, 'application/json', b'{"error": "request too large"}', False)
+                    break
+                raw_body = await reader.readexactly(length) if length else b''
+
+                status, content_type, content = await self.handle_request(method, path, raw_body)
+                keep_alive = (headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1')
+                await self.respond(writer, status, content_type, content, keep_alive)
+                if not keep_alive:
+                    break
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, status, content_type, content, keep_alive):
+        reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large',
+                   500: 'Internal Server Error'}
+        head = (f"HTTP/1.1 {status} {reasons.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(content)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + content)
+        await writer.drain()
+
+def parse_range(body):
+    """Validated (start_date, end_date) Fridays from a request body"""
+    dates = []
+    for field in ('start', 'end'):
+        valid, result = validate_date_format(str(body.get(field, '')))
+        if not valid:
+            raise RequestError(f"{field}: {result}")
+        dates.append(result)
+    if dates[0] >= dates[1]:
+        raise RequestError("End date must be after start date")
+    return dates[0], dates[1]
+
+def parse_weeks(weeks):
+    """Week ordinals from a request's list of 'YYYY-MM-DD' weeks"""
+    if not isinstance(weeks, list) or not weeks or not all(isinstance(week, str) for week in weeks):
+        raise RequestError("weeks must be a non-empty list of YYYY-MM-DD dates")
+    return [week_ordinal(week) for week in weeks]
+
+async def serve(service, host, port):
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Serving {', '.join(sorted(service.databases))} on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve schedule generation over HTTP/JSON")
+    parser.add_argument('databases', nargs='+', help="call_schedule.db files to serve, named by file name")
+    parser.add_argument('--host', default='127.0.0.1', help="address to listen on (default 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="port to listen on (default 8765)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="solver processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    databases = {}
+    for path in args.databases:
+        if not os.path.exists(path):
+            parser.error(f"{path}: database not found")
+        name = os.path.splitext(os.path.basename(path))[0]
+        if name in databases:
+            parser.error(f"{path}: another database is already named {name}")
+        databases[name] = path
+
+    service = ScheduleService(databases, max(1, args.workers))
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())